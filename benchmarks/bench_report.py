@@ -0,0 +1,432 @@
+"""Benchmark the report pipeline against synthetic installs.
+
+Runs entirely in-process: a fake ``hass`` provides the state machine, bus and
+entity/device registries, populated with a synthetic install of the requested
+size. Nothing is loaded from a live Home Assistant and no network is used,
+but the ``homeassistant`` package must be importable (the integration code
+under test imports it).
+
+Usage:
+
+    python benchmarks/bench_report.py
+    python benchmarks/bench_report.py --sizes 1000 10000 --outage-ratio 0.05
+    python benchmarks/bench_report.py --hub-down zha
+    python benchmarks/bench_report.py --output bench_output.txt
+    python benchmarks/bench_report.py --compare baseline.json --tolerance 0.25
+
+Results are printed (or written) as JSON. With --compare the run exits
+non-zero if any phase got slower than the baseline by more than the
+tolerance, so it can gate a release.
+"""
+from __future__ import annotations
+
+import argparse
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+import json
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from homeassistant.const import (  # noqa: E402
+    EVENT_STATE_CHANGED,
+    STATE_UNAVAILABLE,
+    STATE_UNKNOWN,
+    __version__ as HA_VERSION,
+)
+from homeassistant.config_entries import ConfigEntryState  # noqa: E402
+from homeassistant.core import CoreState, Event, State  # noqa: E402
+from homeassistant.helpers import device_registry as dr, entity_registry as er  # noqa: E402
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.ha_unavailable_devices_report.coordinator import (  # noqa: E402
+    UnavailableDevicesCoordinator,
+)
+from custom_components.ha_unavailable_devices_report.engine import SharedEngine, TimeBudget  # noqa: E402
+from custom_components.ha_unavailable_devices_report.report import (  # noqa: E402
+    GRANULARITY_MINUTE,
+    ReportRenderer,
+    iter_pages,
+)
+from custom_components.ha_unavailable_devices_report.sensor import (  # noqa: E402
+    UnavailableDevicesSensor,
+)
+
+DEFAULT_SIZES = [1_000, 10_000, 50_000, 100_000]
+ENTITIES_PER_DEVICE = 5
+PLATFORMS = ["zha", "mqtt", "tuya", "shelly", "esphome", "hue"]
+
+
+@dataclass
+class FakeEntityEntry:
+    """The subset of er.RegistryEntry the integration reads."""
+
+    entity_id: str
+    platform: str
+    device_id: str | None = None
+    config_entry_id: str | None = None
+    area_id: str | None = None
+    entity_category: str | None = None
+    disabled_by: str | None = None
+    hidden_by: str | None = None
+    labels: set[str] = field(default_factory=set)
+
+
+@dataclass
+class FakeDeviceEntry:
+    """The subset of dr.DeviceEntry the integration reads."""
+
+    id: str
+    name: str
+    name_by_user: str | None = None
+    area_id: str | None = None
+    config_entries: set[str] = field(default_factory=set)
+    labels: set[str] = field(default_factory=set)
+
+
+class FakeEntityRegistry:
+    """Entity registry stand-in."""
+
+    def __init__(self) -> None:
+        self.entities: dict[str, FakeEntityEntry] = {}
+
+    def async_get(self, entity_id: str) -> FakeEntityEntry | None:
+        return self.entities.get(entity_id)
+
+
+class FakeDeviceRegistry:
+    """Device registry stand-in."""
+
+    def __init__(self) -> None:
+        self.devices: dict[str, FakeDeviceEntry] = {}
+
+    def async_get(self, device_id: str) -> FakeDeviceEntry | None:
+        return self.devices.get(device_id)
+
+
+class FakeStates:
+    """State machine stand-in."""
+
+    def __init__(self) -> None:
+        self._states: dict[str, State] = {}
+
+    def async_all(self) -> list[State]:
+        return list(self._states.values())
+
+    def get(self, entity_id: str) -> State | None:
+        return self._states.get(entity_id)
+
+    def set(self, state: State) -> None:
+        self._states[state.entity_id] = state
+
+
+class FakeBus:
+    """Event bus stand-in that records listeners so events can be replayed."""
+
+    def __init__(self) -> None:
+        self.listeners: dict[str, list] = {}
+
+    def async_listen(self, event_type: str, listener, *args, **kwargs):
+        self.listeners.setdefault(event_type, []).append(listener)
+
+        def remove() -> None:
+            self.listeners[event_type].remove(listener)
+
+        return remove
+
+    def fire(self, event_type: str, data: dict[str, Any]) -> None:
+        event = Event(event_type, data)
+        for listener in list(self.listeners.get(event_type, [])):
+            listener(event)
+
+
+@dataclass
+class FakeConfigEntry:
+    """The subset of ConfigEntry the integration reads."""
+
+    entry_id: str
+    domain: str
+    title: str
+    state: ConfigEntryState = ConfigEntryState.LOADED
+
+
+class FakeConfigEntries:
+    """Config entry lookup, one entry per platform."""
+
+    def __init__(self) -> None:
+        self.entries: dict[str, FakeConfigEntry] = {}
+
+    def async_get_entry(self, entry_id: str) -> FakeConfigEntry | None:
+        return self.entries.get(entry_id)
+
+
+class FakeConfig:
+    """Config stand-in whose config directory is a temporary directory."""
+
+    def __init__(self) -> None:
+        self.config_dir = tempfile.mkdtemp(prefix="bench_report_")
+
+    def path(self, *parts: str) -> str:
+        return str(Path(self.config_dir, *parts))
+
+
+class FakeHass:
+    """Just enough of HomeAssistant for the report pipeline."""
+
+    def __init__(self) -> None:
+        self.data: dict[Any, Any] = {}
+        self.config = FakeConfig()
+        self.states = FakeStates()
+        self.bus = FakeBus()
+        self.state = CoreState.running
+        self.loop = None
+        self.config_entries = FakeConfigEntries()
+        self.data[er.DATA_REGISTRY] = FakeEntityRegistry()
+        self.data[dr.DATA_REGISTRY] = FakeDeviceRegistry()
+
+
+def build_install(
+    size: int, outage_ratio: float, stray_ratio: float, seed: int, hub_down: str | None = None
+) -> FakeHass:
+    """Populate a fake hass with a synthetic install of `size` entities.
+
+    Most entities belong to devices of ENTITIES_PER_DEVICE entities, one of
+    which is a diagnostic entity. `outage_ratio` of the devices are fully
+    unavailable, and `stray_ratio` of the remaining entities are individually
+    unavailable or unknown. Every device of the `hub_down` platform is down,
+    as if its hub had failed.
+    """
+    rng = random.Random(seed)
+    hass = FakeHass()
+    ent_reg: FakeEntityRegistry = hass.data[er.DATA_REGISTRY]
+    dev_reg: FakeDeviceRegistry = hass.data[dr.DATA_REGISTRY]
+    now = dt_util.utcnow()
+
+    def add(entity_id: str, state: str, entry: FakeEntityEntry | None) -> None:
+        changed = now - timedelta(seconds=rng.randint(0, 7 * 86400))
+        hass.states.set(State(entity_id, state, last_changed=changed, last_updated=changed))
+        if entry is not None:
+            ent_reg.entities[entity_id] = entry
+
+    for platform_name in PLATFORMS:
+        entry_id = f"entry_{platform_name}"
+        hass.config_entries.entries[entry_id] = FakeConfigEntry(entry_id, platform_name, platform_name)
+
+    device_count = int(size * 0.9) // ENTITIES_PER_DEVICE
+    created = 0
+    for d in range(device_count):
+        device_id = f"device{d:06d}"
+        platform_name = PLATFORMS[d % len(PLATFORMS)]
+        dev_reg.devices[device_id] = FakeDeviceEntry(
+            id=device_id,
+            name=f"Device {d:06d}",
+            area_id=f"area{d % 40}",
+            config_entries={f"entry_{platform_name}"},
+        )
+        down = platform_name == hub_down or rng.random() < outage_ratio
+        for e in range(ENTITIES_PER_DEVICE):
+            entity_id = f"sensor.device{d:06d}_{e}"
+            if down:
+                state = STATE_UNAVAILABLE
+            elif rng.random() < stray_ratio:
+                state = rng.choice((STATE_UNAVAILABLE, STATE_UNKNOWN))
+            else:
+                state = "on"
+            add(
+                entity_id,
+                state,
+                FakeEntityEntry(
+                    entity_id=entity_id,
+                    platform=platform_name,
+                    device_id=device_id,
+                    config_entry_id=f"entry_{platform_name}",
+                    entity_category="diagnostic" if e == ENTITIES_PER_DEVICE - 1 else None,
+                ),
+            )
+            created += 1
+
+    # Device-less entities, half of them not in the entity registry at all
+    for n in range(size - created):
+        entity_id = f"binary_sensor.standalone_{n:06d}"
+        state = rng.choice((STATE_UNAVAILABLE, STATE_UNKNOWN)) if rng.random() < stray_ratio else "off"
+        entry = FakeEntityEntry(entity_id=entity_id, platform="template") if n % 2 else None
+        add(entity_id, state, entry)
+
+    return hass
+
+
+def _timed(func, *args) -> tuple[float, Any]:
+    """Return (milliseconds, result) of one call."""
+    start = time.perf_counter()
+    result = func(*args)
+    return (time.perf_counter() - start) * 1000, result
+
+
+async def _timed_async(awaitable) -> tuple[float, Any]:
+    """Return (milliseconds, result) of awaiting an awaitable."""
+    start = time.perf_counter()
+    result = await awaitable
+    return (time.perf_counter() - start) * 1000, result
+
+
+def run_once(hass: FakeHass, event_count: int) -> dict[str, Any]:
+    """Run every phase once against a freshly built install."""
+    coordinator = UnavailableDevicesCoordinator(hass, SharedEngine(hass))
+    coordinator.ready = True
+    phases: dict[str, float] = {}
+
+    phases["index"], _ = _timed(coordinator.index.async_start)
+    phases["scan"], _ = _timed(coordinator.tracker.async_start)
+    # A zero budget never yields, so this times the classification work alone
+    phases["classify"], report = asyncio.run(
+        _timed_async(coordinator._async_build_report(TimeBudget(0)))
+    )
+
+    renderer = ReportRenderer()
+    now = dt_util.utcnow().timestamp()
+    phases["render"], _ = _timed(
+        renderer.update,
+        report.unavailable_devices,
+        report.unknown_devices,
+        report.unavailable_entities,
+        report.unknown_entities,
+        now,
+        GRANULARITY_MINUTE,
+        report.unavailable_integrations,
+        report.integration_members,
+    )
+    lines = [*renderer.devices_lines(), *renderer.entities_lines()]
+    phases["paginate"], pages = _timed(lambda: list(iter_pages(lines)))
+
+    sensor = UnavailableDevicesSensor(coordinator)
+    phases["attributes"], _ = _timed(sensor._async_render, report)
+    payload = json.dumps(sensor._attr_extra_state_attributes, default=str)
+
+    # Incremental path: replay outages and recoveries through the tracker
+    states = hass.states.async_all()
+    sample = states[: min(event_count, len(states))]
+
+    def replay() -> None:
+        for old in sample:
+            new = State(old.entity_id, STATE_UNAVAILABLE if old.state != STATE_UNAVAILABLE else "on")
+            hass.bus.fire(
+                EVENT_STATE_CHANGED,
+                {"entity_id": old.entity_id, "old_state": old, "new_state": new},
+            )
+            hass.bus.fire(
+                EVENT_STATE_CHANGED,
+                {"entity_id": old.entity_id, "old_state": new, "new_state": old},
+            )
+
+    events_ms, _ = _timed(replay)
+    phases["event"] = events_ms / max(len(sample) * 2, 1)
+
+    coordinator.tracker.async_stop()
+    coordinator.index.async_stop()
+
+    return {
+        "phases_ms": phases,
+        "items": {
+            "tracked_unavailable": len(coordinator.tracker.unavailable),
+            "tracked_unknown": len(coordinator.tracker.unknown),
+            "unavailable_integrations": len(report.unavailable_integrations),
+            "unavailable_devices": len(report.unavailable_devices),
+            "unknown_devices": len(report.unknown_devices),
+            "standalone_entities": report.entity_count,
+            "report_lines": len(lines),
+            "pages": len(pages),
+        },
+        "payload_bytes": len(payload.encode("utf-8")),
+    }
+
+
+def bench_size(size: int, args: argparse.Namespace) -> dict[str, Any]:
+    """Benchmark one install size."""
+    hass = build_install(size, args.outage_ratio, args.stray_ratio, args.seed, args.hub_down)
+    runs = [run_once(hass, args.events) for _ in range(args.repeat)]
+
+    # Tracing slows everything down, so measure memory in a separate run
+    tracemalloc.start()
+    run_once(hass, args.events)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    phases = {
+        phase: round(statistics.median(run["phases_ms"][phase] for run in runs), 4)
+        for phase in runs[0]["phases_ms"]
+    }
+    return {
+        "entities": size,
+        "phases_ms": phases,
+        "items": runs[-1]["items"],
+        "payload_bytes": runs[-1]["payload_bytes"],
+        "peak_memory_kib": round(peak / 1024, 1),
+    }
+
+
+def compare(results: dict[str, Any], baseline: dict[str, Any], tolerance: float) -> list[str]:
+    """Return a description of every phase slower than baseline * (1 + tolerance)."""
+    regressions = []
+    base_by_size = {run["entities"]: run for run in baseline.get("runs", [])}
+    for run in results["runs"]:
+        base = base_by_size.get(run["entities"])
+        if base is None:
+            continue
+        for phase, value in run["phases_ms"].items():
+            base_value = base["phases_ms"].get(phase)
+            if base_value and value > base_value * (1 + tolerance):
+                regressions.append(
+                    f"{run['entities']} entities, {phase}: {base_value:.3f} ms -> {value:.3f} ms"
+                )
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--outage-ratio", type=float, default=0.02, help="Fraction of devices fully unavailable")
+    parser.add_argument("--stray-ratio", type=float, default=0.01, help="Fraction of other entities unavailable/unknown")
+    parser.add_argument("--hub-down", choices=PLATFORMS, help="Platform whose devices are all unavailable")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--events", type=int, default=1000, help="State changes to replay through the tracker")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="Write JSON results here instead of stdout")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args()
+
+    results = {
+        "python": platform.python_version(),
+        "homeassistant": HA_VERSION,
+        "outage_ratio": args.outage_ratio,
+        "stray_ratio": args.stray_ratio,
+        "repeat": args.repeat,
+        "runs": [bench_size(size, args) for size in args.sizes],
+    }
+
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+
+    if args.compare:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION: {line}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,10 +3,15 @@ from __future__ import annotations
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import Platform
 from homeassistant.core import HomeAssistant
-from homeassistant.helpers import device_registry as dr, entity_registry as er
 
 import logging
+from .api import async_setup_http
 from .const import DOMAIN, CONF_LOGGING_LEVEL
+from .coordinator import UnavailableDevicesCoordinator
+from .engine import SharedEngine
+from .history import OutageHistory
+from .services import async_setup_services
+from .websocket import async_setup_websocket
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -16,33 +21,15 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up Unavailable Devices Report from a config entry."""
     _set_logging_level(entry.options.get(CONF_LOGGING_LEVEL, "INFO"))
 
-    
-    # Register Services
-    async def async_remove_items(call):
-        """Handle the service call to remove items."""
-        entity_ids = call.data.get("entity_id", [])
-        device_ids = call.data.get("device_id", [])
-        
-        # Ensure lists
-        if isinstance(entity_ids, str):
-            entity_ids = [entity_ids]
-        if isinstance(device_ids, str):
-            device_ids = [device_ids]
-            
-        ent_reg = er.async_get(hass)
-        dev_reg = dr.async_get(hass)
-        
-        for entity_id in entity_ids:
-            if ent_reg.async_get(entity_id):
-                ent_reg.async_remove(entity_id)
-                _LOGGER.info(f"Removed entity: {entity_id}")
-                
-        for device_id in device_ids:
-            if dev_reg.async_get(device_id):
-                dev_reg.async_remove_device(device_id)
-                _LOGGER.info(f"Removed device: {device_id}")
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    async_setup_http(hass)
 
-    hass.services.async_register(DOMAIN, "remove_items", async_remove_items)
+    coordinator = UnavailableDevicesCoordinator(
+        hass, SharedEngine.async_get(hass), config_entry=entry
+    )
+    coordinator.async_start()
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = coordinator
 
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     
@@ -53,13 +40,22 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
-    return await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        coordinator: UnavailableDevicesCoordinator = hass.data[DOMAIN].pop(entry.entry_id)
+        await coordinator.async_shutdown()
+    return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Delete the stored outage history of a removed config entry."""
+    await OutageHistory(hass, entry.entry_id).async_remove()
 
 async def update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
     """Update listener."""
     _LOGGER.debug(f"Update listener called. Options: {entry.options}")
     _set_logging_level(entry.options.get(CONF_LOGGING_LEVEL, "INFO"))
-    await hass.config_entries.async_reload(entry.entry_id)
+    coordinator: UnavailableDevicesCoordinator = hass.data[DOMAIN][entry.entry_id]
+    await coordinator.async_apply_options()
 
 def _set_logging_level(level: str) -> None:
     """Set the logging level."""
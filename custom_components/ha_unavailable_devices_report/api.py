@@ -0,0 +1,185 @@
+"""HTTP API for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+import gzip
+import hashlib
+from http import HTTPStatus
+import json
+from typing import TYPE_CHECKING, Any
+
+from aiohttp import hdrs, web
+
+from homeassistant.components.http import KEY_HASS, HomeAssistantView
+from homeassistant.core import HomeAssistant, callback
+
+from .const import CONF_DURATION_GRANULARITY, DATA_HTTP, DOMAIN
+from .models import ReportItem
+from .report import GRANULARITY_MINUTE, format_duration, isoformat, markdown_row, sorted_items
+
+if TYPE_CHECKING:
+    from .coordinator import UnavailableDevicesCoordinator, UnavailableReport
+
+URL = f"/api/{DOMAIN}"
+
+FORMAT_JSON = "json"
+FORMAT_MARKDOWN = "markdown"
+_CONTENT_TYPES = {
+    FORMAT_JSON: "application/json",
+    FORMAT_MARKDOWN: "text/markdown",
+}
+
+# Rendered responses kept for repeated polls of the same report
+MAX_CACHED_BODIES = 32
+
+
+@callback
+def async_setup_http(hass: HomeAssistant) -> None:
+    """Register the HTTP view once."""
+    if hass.data.get(DATA_HTTP):
+        return
+    hass.data[DATA_HTTP] = True
+    hass.http.register_view(UnavailableReportView())
+
+
+@dataclass(slots=True)
+class _Body:
+    """A rendered response for one report and set of query parameters."""
+
+    report: UnavailableReport
+    content: bytes
+    digest: str
+    gzipped: bytes | None = None
+
+
+class UnavailableReportView(HomeAssistantView):
+    """Serves the last computed report as JSON or Markdown, without rescanning.
+
+    Responses are rendered in the executor once per report and query, and
+    carry an ETag so pollers get a 304 while the report is unchanged. The
+    JSON body holds no timestamps besides the outage starts, so it stays the
+    same for as long as the reported items do.
+    """
+
+    url = URL
+    extra_urls = [f"{URL}/{{entry_id}}"]
+    name = f"api:{DOMAIN}"
+
+    def __init__(self) -> None:
+        """Initialize the view."""
+        self._cache: OrderedDict[tuple, _Body] = OrderedDict()
+
+    async def get(self, request: web.Request, entry_id: str | None = None) -> web.Response:
+        """Return the report of a config entry, or of the first loaded one."""
+        hass = request.app[KEY_HASS]
+        coordinators: dict[str, UnavailableDevicesCoordinator] = hass.data.get(DOMAIN, {})
+        if entry_id is None and coordinators:
+            entry_id = next(iter(coordinators))
+        coordinator = coordinators.get(entry_id)
+        if coordinator is None:
+            return self.json_message("No report is loaded", HTTPStatus.NOT_FOUND)
+        report = coordinator.data
+        if report is None:
+            return self.json_message(
+                "The report has not been computed yet", HTTPStatus.SERVICE_UNAVAILABLE
+            )
+        try:
+            export_format, offset, limit = _parse_query(request.query)
+        except ValueError as err:
+            return self.json_message(str(err), HTTPStatus.BAD_REQUEST)
+
+        key = (entry_id, export_format, offset, limit)
+        body = self._cache.get(key)
+        if body is None or body.report is not report:
+            granularity = coordinator.options.get(CONF_DURATION_GRANULARITY, GRANULARITY_MINUTE)
+            content = await hass.async_add_executor_job(
+                _render,
+                list(report.items().values()),
+                report.computed_at,
+                export_format,
+                offset,
+                limit,
+                granularity,
+            )
+            body = _Body(report, content, hashlib.blake2b(content, digest_size=16).hexdigest())
+            self._cache[key] = body
+        self._cache.move_to_end(key)
+        while len(self._cache) > MAX_CACHED_BODIES:
+            self._cache.popitem(last=False)
+
+        use_gzip = "gzip" in request.headers.get(hdrs.ACCEPT_ENCODING, "")
+        # The compressed representation gets its own entity tag
+        etag = f'"{body.digest}-gzip"' if use_gzip else f'"{body.digest}"'
+        headers = {
+            hdrs.ETAG: etag,
+            hdrs.CACHE_CONTROL: "no-cache",
+            hdrs.VARY: hdrs.ACCEPT_ENCODING,
+        }
+        if _etag_matches(request.headers.get(hdrs.IF_NONE_MATCH), body.digest):
+            return web.Response(status=HTTPStatus.NOT_MODIFIED, headers=headers)
+
+        content = body.content
+        if use_gzip:
+            if body.gzipped is None:
+                body.gzipped = await hass.async_add_executor_job(gzip.compress, body.content)
+            content = body.gzipped
+            headers[hdrs.CONTENT_ENCODING] = "gzip"
+        return web.Response(
+            body=content,
+            content_type=_CONTENT_TYPES[export_format],
+            charset="utf-8",
+            headers=headers,
+        )
+
+
+def _parse_query(query: Mapping[str, str]) -> tuple[str, int, int | None]:
+    """Return the format, offset and limit requested."""
+    export_format = query.get("format", FORMAT_JSON)
+    if export_format not in _CONTENT_TYPES:
+        raise ValueError(f"Unsupported format: {export_format}")
+    try:
+        offset = int(query.get("offset", 0))
+        limit = int(query["limit"]) if "limit" in query else None
+    except ValueError as err:
+        raise ValueError("offset and limit must be integers") from err
+    if offset < 0 or (limit is not None and limit < 1):
+        raise ValueError("offset must not be negative and limit must be positive")
+    return export_format, offset, limit
+
+
+def _etag_matches(header: str | None, digest: str) -> bool:
+    """Return True if an If-None-Match header names either representation."""
+    if not header:
+        return False
+    for tag in header.split(","):
+        tag = tag.strip().removeprefix("W/")
+        if tag == "*" or tag.strip('"').removesuffix("-gzip") == digest:
+            return True
+    return False
+
+
+def _render(
+    items: list[ReportItem],
+    computed_at: float,
+    export_format: str,
+    offset: int,
+    limit: int | None,
+    granularity: str,
+) -> bytes:
+    """Render one page of the report. Runs in the executor."""
+    items = sorted_items(items)
+    page = items[offset:offset + limit if limit is not None else None]
+    if export_format == FORMAT_MARKDOWN:
+        return "".join(
+            f"{markdown_row(item, format_duration(computed_at - item.since, granularity))}\n"
+            for item in page
+        ).encode("utf-8")
+    data: dict[str, Any] = {
+        "total": len(items),
+        "offset": offset,
+        "count": len(page),
+        "items": [{**item.as_dict(), "since": isoformat(item.since)} for item in page],
+    }
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
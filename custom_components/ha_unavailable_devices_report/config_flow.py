@@ -1,10 +1,12 @@
 from __future__ import annotations
 
+import re
 from typing import Any
 
 import voluptuous as vol
 
 from homeassistant import config_entries
+from homeassistant.const import CONF_NAME
 from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 from homeassistant.helpers import selector
@@ -12,7 +14,10 @@ import logging
 
 _LOGGER = logging.getLogger(__name__)
 
-from .const import DOMAIN, CONF_EXCLUDED_DEVICES, CONF_EXCLUDED_ENTITIES, CONF_LOGGING_LEVEL, CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, CONF_IGNORE_UNKNOWN
+from .const import DOMAIN, CONF_EXCLUDED_DEVICES, CONF_EXCLUDED_ENTITIES, CONF_EXCLUDED_PATTERNS, CONF_EXCLUDED_INTEGRATIONS, CONF_EXCLUDED_AREAS, CONF_LOGGING_LEVEL, CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, CONF_IGNORE_UNKNOWN, CONF_CONSISTENCY_CHECK, CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS, CONF_DURATION_GRANULARITY, CONF_SCAN_BUDGET, DEFAULT_SCAN_BUDGET, CONF_GRACE_PERIOD, DEFAULT_GRACE_PERIOD, CONF_RECOVERY_DELAY, DEFAULT_RECOVERY_DELAY, CONF_STARTUP_SIGNAL, STARTUP_SIGNAL_STARTED, STARTUP_SIGNALS, CONF_VIEW_AREAS, CONF_VIEW_FLOORS, CONF_VIEW_INTEGRATIONS, CONF_VIEW_LABELS, DEFAULT_NAME, CONF_ATTRIBUTE_BUDGET, DEFAULT_ATTRIBUTE_BUDGET, MIN_ATTRIBUTE_BUDGET, CONF_ATTRIBUTE_PRIORITY, ATTRIBUTE_GROUPS, CONF_COLLAPSE_THRESHOLD, DEFAULT_COLLAPSE_THRESHOLD, CONF_EXPORT_FORMATS, CONF_EXPORT_KEEP, DEFAULT_EXPORT_KEEP, CONF_EXPORT_MAX_SIZE, DEFAULT_EXPORT_MAX_SIZE
+from .exclusions import compile_patterns
+from .export import EXPORT_FORMATS
+from .report import DURATION_GRANULARITIES, GRANULARITY_MINUTE
 
 class UnavailableDevicesReportConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Unavailable Devices Report."""
@@ -23,20 +28,23 @@ class UnavailableDevicesReportConfigFlow(config_entries.ConfigFlow, domain=DOMAI
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Handle the initial step."""
-        if self._async_current_entries():
-            return self.async_abort(reason="single_instance_allowed")
-
+        # Every entry is a report view; narrow it down with the view filters in its options
         if user_input is not None:
-            return self.async_create_entry(title="Unavailable Devices Report", data=user_input)
+            return self.async_create_entry(title=user_input[CONF_NAME], data={})
 
-        return self.async_show_form(step_id="user")
+        return self.async_show_form(
+            step_id="user",
+            data_schema=vol.Schema(
+                {vol.Required(CONF_NAME, default=DEFAULT_NAME): selector.TextSelector()}
+            ),
+        )
 
     async def async_step_import(self, user_input: dict[str, Any] | None = None) -> FlowResult:
         """Handle import from YAML."""
         if self._async_current_entries():
             return self.async_abort(reason="single_instance_allowed")
         
-        return self.async_create_entry(title="Unavailable Devices Report", data=user_input or {})
+        return self.async_create_entry(title=DEFAULT_NAME, data=user_input or {})
 
     @staticmethod
     @callback
@@ -58,29 +66,79 @@ class UnavailableDevicesReportOptionsFlowHandler(config_entries.OptionsFlow):
         self, user_input: dict[str, Any] | None = None
     ) -> FlowResult:
         """Manage the options."""
+        errors = {}
+        defaults = self._config_entry.options
+
         if user_input is not None:
-            return self.async_create_entry(title="", data=user_input)
+            try:
+                compile_patterns(user_input.get(CONF_EXCLUDED_PATTERNS, []))
+            except re.error as e:
+                _LOGGER.warning("Invalid exclusion pattern: %s", e)
+                errors[CONF_EXCLUDED_PATTERNS] = "invalid_pattern"
+                defaults = user_input
+            else:
+                return self.async_create_entry(title="", data=user_input)
 
-        errors = {}
-        
         try:
             schema = vol.Schema(
                 {
                     vol.Optional(
                         CONF_EXCLUDED_DEVICES,
-                        default=self._config_entry.options.get(CONF_EXCLUDED_DEVICES, []),
+                        default=defaults.get(CONF_EXCLUDED_DEVICES, []),
                     ): selector.DeviceSelector(
                         selector.DeviceSelectorConfig(multiple=True)
                     ),
                     vol.Optional(
                         CONF_EXCLUDED_ENTITIES,
-                        default=self._config_entry.options.get(CONF_EXCLUDED_ENTITIES, []),
+                        default=defaults.get(CONF_EXCLUDED_ENTITIES, []),
                     ): selector.EntitySelector(
                         selector.EntitySelectorConfig(multiple=True)
                     ),
+                    vol.Optional(
+                        CONF_EXCLUDED_PATTERNS,
+                        default=defaults.get(CONF_EXCLUDED_PATTERNS, []),
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_EXCLUDED_INTEGRATIONS,
+                        default=defaults.get(CONF_EXCLUDED_INTEGRATIONS, []),
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_EXCLUDED_AREAS,
+                        default=defaults.get(CONF_EXCLUDED_AREAS, []),
+                    ): selector.AreaSelector(
+                        selector.AreaSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_VIEW_AREAS,
+                        default=defaults.get(CONF_VIEW_AREAS, []),
+                    ): selector.AreaSelector(
+                        selector.AreaSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_VIEW_FLOORS,
+                        default=defaults.get(CONF_VIEW_FLOORS, []),
+                    ): selector.FloorSelector(
+                        selector.FloorSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_VIEW_INTEGRATIONS,
+                        default=defaults.get(CONF_VIEW_INTEGRATIONS, []),
+                    ): selector.TextSelector(
+                        selector.TextSelectorConfig(multiple=True)
+                    ),
+                    vol.Optional(
+                        CONF_VIEW_LABELS,
+                        default=defaults.get(CONF_VIEW_LABELS, []),
+                    ): selector.LabelSelector(
+                        selector.LabelSelectorConfig(multiple=True)
+                    ),
                     vol.Optional(
                         CONF_LOGGING_LEVEL,
-                        default=self._config_entry.options.get(CONF_LOGGING_LEVEL, "INFO"),
+                        default=defaults.get(CONF_LOGGING_LEVEL, "INFO"),
                     ): selector.SelectSelector(
                         selector.SelectSelectorConfig(
                             options=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"],
@@ -89,7 +147,7 @@ class UnavailableDevicesReportOptionsFlowHandler(config_entries.OptionsFlow):
                     ),
                     vol.Optional(
                         CONF_SCAN_INTERVAL,
-                        default=self._config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
+                        default=defaults.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL),
                     ): selector.NumberSelector(
                         selector.NumberSelectorConfig(
                             min=30,
@@ -99,9 +157,145 @@ class UnavailableDevicesReportOptionsFlowHandler(config_entries.OptionsFlow):
                             mode=selector.NumberSelectorMode.BOX,
                         )
                     ),
+                    vol.Optional(
+                        CONF_DURATION_GRANULARITY,
+                        default=defaults.get(CONF_DURATION_GRANULARITY, GRANULARITY_MINUTE),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=DURATION_GRANULARITIES,
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_MAX_STALENESS,
+                        default=defaults.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=86400,
+                            step=60,
+                            unit_of_measurement="seconds",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_COLLAPSE_THRESHOLD,
+                        default=defaults.get(CONF_COLLAPSE_THRESHOLD, DEFAULT_COLLAPSE_THRESHOLD),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=1000,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_ATTRIBUTE_BUDGET,
+                        default=defaults.get(CONF_ATTRIBUTE_BUDGET, DEFAULT_ATTRIBUTE_BUDGET),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=MIN_ATTRIBUTE_BUDGET,
+                            max=262144,
+                            step=1024,
+                            unit_of_measurement="bytes",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_ATTRIBUTE_PRIORITY,
+                        default=defaults.get(CONF_ATTRIBUTE_PRIORITY, ATTRIBUTE_GROUPS),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=ATTRIBUTE_GROUPS,
+                            multiple=True,
+                            mode=selector.SelectSelectorMode.LIST,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_EXPORT_FORMATS,
+                        default=defaults.get(CONF_EXPORT_FORMATS, []),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=EXPORT_FORMATS,
+                            multiple=True,
+                            mode=selector.SelectSelectorMode.LIST,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_EXPORT_KEEP,
+                        default=defaults.get(CONF_EXPORT_KEEP, DEFAULT_EXPORT_KEEP),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=100,
+                            step=1,
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_EXPORT_MAX_SIZE,
+                        default=defaults.get(CONF_EXPORT_MAX_SIZE, DEFAULT_EXPORT_MAX_SIZE),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=1,
+                            max=10240,
+                            step=1,
+                            unit_of_measurement="MiB",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_GRACE_PERIOD,
+                        default=defaults.get(CONF_GRACE_PERIOD, DEFAULT_GRACE_PERIOD),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=3600,
+                            step=5,
+                            unit_of_measurement="seconds",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_RECOVERY_DELAY,
+                        default=defaults.get(CONF_RECOVERY_DELAY, DEFAULT_RECOVERY_DELAY),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=3600,
+                            step=5,
+                            unit_of_measurement="seconds",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_SCAN_BUDGET,
+                        default=defaults.get(CONF_SCAN_BUDGET, DEFAULT_SCAN_BUDGET),
+                    ): selector.NumberSelector(
+                        selector.NumberSelectorConfig(
+                            min=0,
+                            max=1000,
+                            step=5,
+                            unit_of_measurement="ms",
+                            mode=selector.NumberSelectorMode.BOX,
+                        )
+                    ),
+                    vol.Optional(
+                        CONF_STARTUP_SIGNAL,
+                        default=defaults.get(CONF_STARTUP_SIGNAL, STARTUP_SIGNAL_STARTED),
+                    ): selector.SelectSelector(
+                        selector.SelectSelectorConfig(
+                            options=STARTUP_SIGNALS,
+                            mode=selector.SelectSelectorMode.DROPDOWN,
+                        )
+                    ),
                     vol.Optional(
                         CONF_IGNORE_UNKNOWN,
-                        default=self._config_entry.options.get(CONF_IGNORE_UNKNOWN, False),
+                        default=defaults.get(CONF_IGNORE_UNKNOWN, False),
+                    ): selector.BooleanSelector(),
+                    vol.Optional(
+                        CONF_CONSISTENCY_CHECK,
+                        default=defaults.get(CONF_CONSISTENCY_CHECK, False),
                     ): selector.BooleanSelector(),
                 }
             )
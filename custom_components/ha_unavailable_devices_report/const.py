@@ -1,10 +1,76 @@
 """Constants for the Unavailable Devices Report integration."""
 
 DOMAIN = "unavailable_devices_report"
+# hass.data key of the engine shared by all report views
+DATA_ENGINE = f"{DOMAIN}_engine"
+# hass.data flag set once the HTTP view is registered
+DATA_HTTP = f"{DOMAIN}_http"
+DEFAULT_NAME = "Unavailable Devices Report"
+# Stands in for the config entry ID of the report set up from YAML
+YAML_ENTRY_ID = "yaml_config"
 CONF_EXCLUDED_DEVICES = "excluded_devices"
 CONF_EXCLUDED_ENTITIES = "excluded_entities"
+CONF_EXCLUDED_PATTERNS = "excluded_patterns"
+CONF_EXCLUDED_INTEGRATIONS = "excluded_integrations"
+CONF_EXCLUDED_AREAS = "excluded_areas"
 CONF_LOGGING_LEVEL = "logging_level"
 CONF_SCAN_INTERVAL = "scan_interval"
 CONF_IGNORE_UNKNOWN = "ignore_unknown"
+CONF_CONSISTENCY_CHECK = "consistency_check"
+CONF_MAX_STALENESS = "max_staleness"
+CONF_DURATION_GRANULARITY = "duration_granularity"
+CONF_SCAN_BUDGET = "scan_budget"
+CONF_GRACE_PERIOD = "grace_period"
+CONF_RECOVERY_DELAY = "recovery_delay"
+CONF_STARTUP_SIGNAL = "startup_signal"
+CONF_ATTRIBUTE_BUDGET = "attribute_budget"
+CONF_ATTRIBUTE_PRIORITY = "attribute_priority"
+CONF_COLLAPSE_THRESHOLD = "collapse_threshold"
+CONF_EXPORT_FORMATS = "export_formats"
+CONF_EXPORT_KEEP = "export_keep"
+CONF_EXPORT_MAX_SIZE = "export_max_size"
+CONF_VIEW_AREAS = "view_areas"
+CONF_VIEW_FLOORS = "view_floors"
+CONF_VIEW_INTEGRATIONS = "view_integrations"
+CONF_VIEW_LABELS = "view_labels"
 
 DEFAULT_SCAN_INTERVAL = 60
+# Seconds after which an unchanged report is written anyway (0 disables)
+DEFAULT_MAX_STALENESS = 3600
+# Milliseconds a scan may run before yielding to the event loop (0 never yields)
+DEFAULT_SCAN_BUDGET = 20
+# Seconds an item must stay down before it is reported (0 reports at once)
+DEFAULT_GRACE_PERIOD = 0
+# Seconds a recovered item stays in the report (0 removes it at once)
+DEFAULT_RECOVERY_DELAY = 0
+# Bytes the serialized report attributes may take; Home Assistant adds a few
+# attributes of its own and the recorder refuses anything above 16 KiB
+DEFAULT_ATTRIBUTE_BUDGET = 15360
+MIN_ATTRIBUTE_BUDGET = 4096
+# Report attribute groups, filled in priority order until the budget runs out
+ATTRIBUTE_GROUP_IDS = "ids"
+ATTRIBUTE_GROUP_PAGES = "pages"
+ATTRIBUTE_GROUP_DEVICES = "devices"
+ATTRIBUTE_GROUP_ENTITIES = "entities"
+ATTRIBUTE_GROUP_EXCLUDED = "excluded"
+ATTRIBUTE_GROUPS = [
+    ATTRIBUTE_GROUP_PAGES,
+    ATTRIBUTE_GROUP_IDS,
+    ATTRIBUTE_GROUP_DEVICES,
+    ATTRIBUTE_GROUP_ENTITIES,
+    ATTRIBUTE_GROUP_EXCLUDED,
+]
+# Fewest items of a config entry that are folded into one "integration down" row (0 disables)
+DEFAULT_COLLAPSE_THRESHOLD = 3
+# Previous export snapshots kept per file, and the MiB they may take together
+DEFAULT_EXPORT_KEEP = 5
+DEFAULT_EXPORT_MAX_SIZE = 50
+# When the first report is published
+STARTUP_SIGNAL_STARTED = "started"
+STARTUP_SIGNAL_ENTRIES_LOADED = "entries_loaded"
+STARTUP_SIGNALS = [STARTUP_SIGNAL_STARTED, STARTUP_SIGNAL_ENTRIES_LOADED]
+# Seconds between checks for config entries still setting up, and the most to wait
+ENTRIES_LOADED_POLL = 5
+ENTRIES_LOADED_TIMEOUT = 600
+# Seconds to coalesce bursts of state changes into a single report refresh
+REFRESH_COOLDOWN = 2
@@ -0,0 +1,711 @@
+"""Report coordinator for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import dataclass, field
+from datetime import timedelta
+import logging
+import time
+from typing import Any, NamedTuple
+
+from homeassistant.config_entries import ConfigEntry, ConfigEntryState
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, HomeAssistant, callback
+from homeassistant.helpers.debounce import Debouncer
+from homeassistant.helpers.event import async_call_later
+from homeassistant.helpers.start import async_at_started
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator
+
+from .const import (
+    CONF_COLLAPSE_THRESHOLD,
+    CONF_CONSISTENCY_CHECK,
+    CONF_EXPORT_FORMATS,
+    CONF_EXCLUDED_DEVICES,
+    CONF_EXCLUDED_ENTITIES,
+    CONF_GRACE_PERIOD,
+    CONF_IGNORE_UNKNOWN,
+    CONF_RECOVERY_DELAY,
+    CONF_SCAN_BUDGET,
+    CONF_SCAN_INTERVAL,
+    CONF_STARTUP_SIGNAL,
+    DEFAULT_COLLAPSE_THRESHOLD,
+    DEFAULT_GRACE_PERIOD,
+    DEFAULT_RECOVERY_DELAY,
+    DEFAULT_SCAN_BUDGET,
+    DEFAULT_SCAN_INTERVAL,
+    DOMAIN,
+    ENTRIES_LOADED_POLL,
+    ENTRIES_LOADED_TIMEOUT,
+    REFRESH_COOLDOWN,
+    STARTUP_SIGNAL_ENTRIES_LOADED,
+    STARTUP_SIGNAL_STARTED,
+    YAML_ENTRY_ID,
+)
+from .engine import DEVICE_UNAVAILABLE, YIELD_EVERY, SharedEngine, TimeBudget
+from .exclusions import ExclusionMatcher, ViewFilter
+from .export import ReportExporter
+from .history import OutageHistory
+from .models import (
+    ITEM_DEVICE,
+    ITEM_ENTITY,
+    ITEM_INTEGRATION,
+    DeviceRecord,
+    EntityRecord,
+    IntegrationRecord,
+    ReportItem,
+)
+from .stats import ScanCycle, ScanStats
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _Candidate(NamedTuple):
+    """A tracked entity that passed the exclusions and view filter."""
+
+    entity_id: str
+    state: str
+    device_id: str | None
+    since: float
+    is_registered: bool
+    config_entry_id: str | None
+
+
+# Config entry states that mean the integration itself is down
+FAILED_ENTRY_STATES = (ConfigEntryState.SETUP_ERROR, ConfigEntryState.SETUP_RETRY)
+
+
+@dataclass
+class UnavailableReport:
+    """One computed report."""
+
+    unavailable_devices: dict[str, DeviceRecord]
+    unknown_devices: dict[str, DeviceRecord]
+    unavailable_entities: list[EntityRecord]
+    unknown_entities: list[EntityRecord]
+    excluded_devices: list[str]
+    excluded_entities: list[str]
+    # Config entries that are down as a whole. Their devices and entities stay
+    # listed above; renderers show one row per entry in their place.
+    unavailable_integrations: dict[str, IntegrationRecord] = field(default_factory=dict)
+    # Item key of each device and entity -> the down config entry it belongs to
+    integration_members: dict[str, str] = field(default_factory=dict)
+    computed_at: float = field(default_factory=time.time, compare=False)
+    _items: dict[str, ReportItem] | None = field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def device_count(self) -> int:
+        """Return the number of fully failed devices."""
+        return len(self.unavailable_devices) + len(self.unknown_devices)
+
+    @property
+    def entity_count(self) -> int:
+        """Return the number of standalone entities."""
+        return len(self.unavailable_entities) + len(self.unknown_entities)
+
+    @property
+    def count(self) -> int:
+        """Return the number of unavailable devices and standalone entities."""
+        return self.device_count + self.entity_count
+
+    def items(self) -> dict[str, ReportItem]:
+        """Return every reported integration, device and entity as a flat item.
+
+        Items are keyed by "<type>:<id>" so reports can be compared item by
+        item. They are built on first use and shared by all consumers.
+        """
+        if self._items is not None:
+            return self._items
+        items: dict[str, ReportItem] = {}
+        for entry_id, integration in self.unavailable_integrations.items():
+            items[f"{ITEM_INTEGRATION}:{entry_id}"] = ReportItem(
+                ITEM_INTEGRATION, entry_id, integration.name, STATE_UNAVAILABLE, integration.since, True
+            )
+        for state, devices in (
+            (STATE_UNAVAILABLE, self.unavailable_devices),
+            (STATE_UNKNOWN, self.unknown_devices),
+        ):
+            for device_id, device in devices.items():
+                items[f"{ITEM_DEVICE}:{device_id}"] = ReportItem(
+                    ITEM_DEVICE, device_id, device.name, state, device.since, True
+                )
+        for state, entities in (
+            (STATE_UNAVAILABLE, self.unavailable_entities),
+            (STATE_UNKNOWN, self.unknown_entities),
+        ):
+            for entity in entities:
+                items[f"{ITEM_ENTITY}:{entity.entity}"] = ReportItem(
+                    ITEM_ENTITY, entity.entity, entity.entity, state, entity.since, entity.is_registered
+                )
+        self._items = items
+        return items
+
+
+class UnavailableDevicesCoordinator(DataUpdateCoordinator[UnavailableReport]):
+    """Computes the report from the live tracker and registry index.
+
+    A refresh is requested (debounced) whenever tracked membership or the
+    registries change, and runs on the scan interval to keep durations
+    current. All report entities of a config entry share its result.
+
+    Every coordinator is one report view. The tracked sets, registry index
+    and full scans come from the engine shared by all views; a view only
+    adds its own filtering and classification.
+
+    Scans run in time-budgeted slices so a large installation never blocks
+    the event loop for long. A refresh that starts while a scan is still in
+    flight cancels it; callers waiting on the old scan get the new result.
+
+    With a grace period, an entity is only reported once it has been down
+    that long, and a device once all its entities have. With a recovery
+    delay, a recovered item stays in the report that long. Both are driven
+    by one timer per pending item instead of extra scans.
+
+    A config entry that is down as a whole, like a failed hub, is reported
+    as one integration row instead of all of its devices and entities.
+    """
+
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        engine: SharedEngine,
+        config_entry: ConfigEntry | None = None,
+        yaml_exclusions: list[str] | None = None,
+    ) -> None:
+        """Initialize the coordinator."""
+        self.entry = config_entry
+        self.options = config_entry.options if config_entry else {}
+        interval = self.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=DOMAIN,
+            update_interval=timedelta(seconds=interval),
+            request_refresh_debouncer=Debouncer(
+                hass, _LOGGER, cooldown=REFRESH_COOLDOWN, immediate=False
+            ),
+        )
+        self._yaml_exclusions = yaml_exclusions or []
+        self.exclusions = ExclusionMatcher.from_options(self.options, self._yaml_exclusions)
+        self.view = ViewFilter.from_options(self.options)
+        self.engine = engine
+        self.index = engine.index
+        self.tracker = engine.tracker
+        self.ready = False
+        # Set once the shared engine is released, as shutdown runs both from
+        # the entry unload and from the unload callback of the base class
+        self._released = False
+        self.stats = ScanStats()
+        self.history = OutageHistory(hass, config_entry.entry_id if config_entry else "yaml")
+        self.exporter = ReportExporter(hass, config_entry.entry_id if config_entry else YAML_ENTRY_ID)
+        self._startup_task: asyncio.Task | None = None
+        self._scan_task: asyncio.Task[UnavailableReport] | None = None
+        self._unsubs: list[CALLBACK_TYPE] = []
+        # Per-item timers for the grace period and recovery delay
+        self._timers: dict[str, CALLBACK_TYPE] = {}
+        # Items that left the report and when, while their recovery delay runs
+        self._recovering: dict[str, float] = {}
+        _LOGGER.debug(f"Coordinator initialized. Interval: {interval}s. Options: {self.options}")
+
+    @property
+    def excluded_device_ids(self) -> list[str]:
+        """Return excluded device IDs."""
+        return self.options.get(CONF_EXCLUDED_DEVICES, [])
+
+    @property
+    def excluded_entity_ids(self) -> list[str]:
+        """Return excluded entity IDs."""
+        if self.entry:
+            return self.options.get(CONF_EXCLUDED_ENTITIES, [])
+        return self._yaml_exclusions
+
+    async def async_apply_options(self) -> None:
+        """Apply changed config entry options in place and refresh the report.
+
+        The tracked sets and the registry index do not depend on the options,
+        so only the classification reruns; unchanged report rows keep their
+        rendered lines.
+        """
+        self.options = self.entry.options
+        self.exclusions = ExclusionMatcher.from_options(self.options, self._yaml_exclusions)
+        self.view = ViewFilter.from_options(self.options)
+        interval = self.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
+        self.update_interval = timedelta(seconds=interval)
+        _LOGGER.debug(f"Options applied. Interval: {interval}s. Options: {self.options}")
+        if self.ready:
+            # Refreshing also reschedules the interval timer
+            await self.async_refresh()
+
+    @callback
+    def async_start(self) -> None:
+        """Start tracking and schedule the first report."""
+        self.engine.async_add_user()
+        self._unsubs = [
+            self.tracker.async_add_listener(self._async_membership_changed),
+            self.index.async_add_listener(self._async_membership_changed),
+        ]
+        self._startup_task = self.hass.async_create_task(self._async_warm_up())
+
+    async def async_shutdown(self) -> None:
+        """Stop tracking and cancel any scheduled refresh.
+
+        Safe to call more than once; only the first call releases the engine.
+        """
+        if self._released:
+            return
+        self._released = True
+        if self._startup_task is not None:
+            self._startup_task.cancel()
+            self._startup_task = None
+        if self._scan_task is not None:
+            self._scan_task.cancel()
+            self._scan_task = None
+        while self._unsubs:
+            self._unsubs.pop()()
+        self._async_cancel_timers(set())
+        self.exporter.async_cancel()
+        self.engine.async_remove_user()
+        if self.ready:
+            # Only once loaded, or an empty history would overwrite the stored one
+            await self.history.async_save()
+        await super().async_shutdown()
+
+    async def _async_warm_up(self) -> None:
+        """Wait for the engine's seeding scan, then publish once HA is ready.
+
+        The tracker follows state changes from the start, so the seeding scan
+        can run while the rest of Home Assistant is still starting up.
+        """
+        await self.history.async_load()
+        await self.engine.async_wait_warm()
+
+        await self._async_wait_until_ready()
+        self.ready = True
+        self._startup_task = None
+        await self.async_refresh()
+
+    async def _async_wait_until_ready(self) -> None:
+        """Wait for the configured startup signal."""
+        started = self.hass.loop.create_future()
+
+        @callback
+        def _async_started(_hass: HomeAssistant) -> None:
+            if not started.done():
+                started.set_result(None)
+
+        unsub = async_at_started(self.hass, _async_started)
+        try:
+            await started
+        finally:
+            unsub()
+        _LOGGER.debug("Home Assistant has started")
+
+        if self.options.get(CONF_STARTUP_SIGNAL, STARTUP_SIGNAL_STARTED) != STARTUP_SIGNAL_ENTRIES_LOADED:
+            return
+        deadline = time.monotonic() + ENTRIES_LOADED_TIMEOUT
+        while pending := self._pending_config_entries():
+            if time.monotonic() >= deadline:
+                _LOGGER.warning(
+                    "Publishing the report while %d config entries are still setting up",
+                    len(pending),
+                )
+                return
+            _LOGGER.debug("Waiting for %d config entries to load", len(pending))
+            await asyncio.sleep(ENTRIES_LOADED_POLL)
+
+    def _pending_config_entries(self) -> list[ConfigEntry]:
+        """Return enabled config entries that have not finished setting up."""
+        return [
+            entry
+            for entry in self.hass.config_entries.async_entries()
+            if entry.disabled_by is None
+            and entry.state in (ConfigEntryState.NOT_LOADED, ConfigEntryState.SETUP_IN_PROGRESS)
+        ]
+
+    @callback
+    def _async_membership_changed(self) -> None:
+        """Schedule a refresh when tracked entities or the registries change."""
+        if self.ready:
+            self.hass.async_create_task(self.async_request_refresh())
+
+    @callback
+    def _async_schedule_timer(self, key: str, delay: float) -> None:
+        """Request a refresh once an item's grace period or recovery delay ends."""
+        if key in self._timers:
+            return
+
+        @callback
+        def _async_timer_fired(_now: Any) -> None:
+            self._timers.pop(key, None)
+            self._async_membership_changed()
+
+        self._timers[key] = async_call_later(self.hass, max(delay, 0), _async_timer_fired)
+
+    @callback
+    def _async_recovering(self, key: str, now: float, delay: float, pending: set[str]) -> bool:
+        """Return True while a recovered item is within its recovery delay."""
+        remaining = self._recovering.setdefault(key, now) + delay - now
+        if remaining <= 0:
+            return False
+        pending.add(key)
+        self._async_schedule_timer(key, remaining)
+        return True
+
+    @callback
+    def _async_cancel_timers(self, keep: set[str]) -> None:
+        """Cancel the timers of items that are no longer pending."""
+        for key in [key for key in self._timers if key not in keep]:
+            self._timers.pop(key)()
+
+    def _new_budget(self) -> TimeBudget:
+        """Return a fresh time budget for one scan."""
+        return TimeBudget(self.options.get(CONF_SCAN_BUDGET, DEFAULT_SCAN_BUDGET))
+
+    async def _async_update_data(self) -> UnavailableReport | None:
+        """Compute the report."""
+        if not self.ready:
+            _LOGGER.debug("Skipping check - warming up")
+            return self.data
+
+        if self._scan_task is not None and not self._scan_task.done():
+            _LOGGER.debug("Superseding in-flight report scan")
+            self._scan_task.cancel()
+        task = self._scan_task = self.hass.async_create_task(self._async_scan())
+
+        while True:
+            try:
+                return await asyncio.shield(task)
+            except asyncio.CancelledError:
+                # Re-raise unless the scan was cancelled by a newer one
+                if not task.cancelled() or task is self._scan_task:
+                    raise
+                task = self._scan_task
+
+    async def _async_scan(self) -> UnavailableReport:
+        """Run one time-budgeted scan and classification."""
+        cycle = self.stats.start_cycle()
+        budget = self._new_budget()
+        try:
+            report = await self._async_scan_cycle(cycle, budget)
+        except asyncio.CancelledError:
+            cycle.counts["superseded"] = 1
+            raise
+        cycle.counts = {
+            "tracked_unavailable": len(self.tracker.unavailable),
+            "tracked_unknown": len(self.tracker.unknown),
+            "unavailable_integrations": len(report.unavailable_integrations),
+            "unavailable_devices": len(report.unavailable_devices),
+            "unknown_devices": len(report.unknown_devices),
+            "standalone_entities": report.entity_count,
+            "slices": budget.slices,
+        }
+        self.history.async_update(report.items(), report.computed_at)
+        if export_formats := self.options.get(CONF_EXPORT_FORMATS):
+            self.exporter.async_schedule(report, export_formats, self.options)
+        _LOGGER.info(f"Report updated: {report.count} devices/entities unavailable")
+        return report
+
+    async def _async_scan_cycle(self, cycle: ScanCycle, budget: TimeBudget) -> UnavailableReport:
+        """Run the phases of one scan, recording their timings."""
+        if (
+            self.options.get(CONF_CONSISTENCY_CHECK, False)
+            and time.monotonic() - self.engine.last_full_scan >= self.update_interval.total_seconds()
+        ):
+            with cycle.measure("scan"):
+                drift = await self.engine.async_full_scan(budget)
+            if drift:
+                _LOGGER.warning("Consistency check found drift in tracked entities")
+
+        with cycle.measure("classify"):
+            return await self._async_build_report(budget)
+
+    async def _async_build_report(self, budget: TimeBudget) -> UnavailableReport:
+        """Classify the tracked entities into devices and standalone entities."""
+        _LOGGER.debug("Starting unavailable devices check")
+        index = self.index
+
+        candidates: list[_Candidate] = []
+
+        # Check ignore_unknown option
+        ignore_unknown = self.options.get(CONF_IGNORE_UNKNOWN, False)
+
+        now = time.time()
+        grace_period = self.options.get(CONF_GRACE_PERIOD, DEFAULT_GRACE_PERIOD)
+        recovery_delay = self.options.get(CONF_RECOVERY_DELAY, DEFAULT_RECOVERY_DELAY)
+        # Keys of items waiting on a grace period or recovery delay
+        pending: set[str] = set()
+        # Devices with an entity still in its grace period cannot be a full failure
+        deferred_device_ids = set()
+
+        # Iterate over the tracked unavailable/unknown states only
+        tracked_states = list(self.tracker.unavailable.values())
+        if not ignore_unknown:
+            tracked_states.extend(self.tracker.unknown.values())
+
+        for idx, state in enumerate(tracked_states):
+            if not idx % YIELD_EVERY:
+                await budget.async_yield()
+            entity_id = state.entity_id
+
+            # Check entity registry
+            entity_entry = index.entity_entry(entity_id)
+
+            # Filter out Diagnostic and Config entities
+            if entity_entry and entity_entry.entity_category in ["diagnostic", "config"]:
+                continue
+
+            # Resolve Device Info
+            device_id = None
+            device_name = None
+
+            # Check entity registry for device_id
+            if entity_entry and entity_entry.device_id:
+                device_id = entity_entry.device_id
+                device_name = index.device_name(device_id)
+
+            # Check Exclusions
+            reason = self.exclusions.match(
+                entity_id, entity_entry, device_id, device_name, index.device_area_id(device_id)
+            )
+            if reason:
+                _LOGGER.debug("Excluding %s (%s)", entity_id, reason)
+                continue
+
+            # Check the view filter
+            if self.view and not self.view.match(
+                entity_entry,
+                index.device_entry(device_id) if device_id else None,
+                index.area_floor_id,
+            ):
+                continue
+
+            is_reg = False
+            if entity_entry:
+                # Only consider registered if not hidden and not disabled
+                if not entity_entry.hidden_by and not entity_entry.disabled_by:
+                    is_reg = True
+
+            since = state.last_changed.timestamp()
+            if grace_period and now - since < grace_period:
+                key = f"{ITEM_ENTITY}:{entity_id}"
+                pending.add(key)
+                self._async_schedule_timer(key, since + grace_period - now)
+                if device_id:
+                    deferred_device_ids.add(device_id)
+                continue
+
+            candidates.append(
+                _Candidate(
+                    entity_id,
+                    state.state,
+                    device_id,
+                    since,
+                    is_reg,
+                    entity_entry.config_entry_id if entity_entry else None,
+                )
+            )
+
+        _LOGGER.debug(f"Found {len(candidates)} unavailable items/entities after exclusions")
+        # Lazy formatting: the item list is only rendered when DEBUG is enabled
+        _LOGGER.debug("Unavailable items details: %s", candidates)
+
+        # Process Report
+        # 1. Find when each candidate device went down
+        device_since: dict[str, float] = {}
+        for candidate in candidates:
+            device_id = candidate.device_id
+            if device_id:
+                # A device has been down since its oldest outage
+                since = device_since.get(device_id)
+                if since is None or candidate.since < since:
+                    device_since[device_id] = candidate.since
+
+        # 2. Identify Full Device Failures
+        full_failure_device_ids = set()
+        unavailable_devices: dict[str, DeviceRecord] = {}
+        unknown_devices: dict[str, DeviceRecord] = {}
+
+        for idx, (device_id, since) in enumerate(device_since.items()):
+            if not idx % YIELD_EVERY:
+                await budget.async_yield()
+            # Full failure if all eligible entities are either unavailable or unknown
+            status = self.tracker.device_status(device_id)
+            if status is not None and device_id not in deferred_device_ids:
+                full_failure_device_ids.add(device_id)
+                record = DeviceRecord(index.device_name(device_id), since)
+
+                # If ANY entity is truly unavailable, mark device as Unavailable (higher severity)
+                # Otherwise (all unknown), mark as Unknown
+                if status == DEVICE_UNAVAILABLE:
+                    unavailable_devices[device_id] = record
+                else:
+                    unknown_devices[device_id] = record
+            else:
+                # Partial Device Failure
+                _LOGGER.debug("Device %s is partially active.", index.device_name(device_id))
+
+        # 3. Group the items of config entries that are down as a whole
+        integrations, members = self._collapse_config_entries(candidates, full_failure_device_ids)
+
+        previous = self.data if recovery_delay else None
+        if previous is not None:
+            # Keep recovered integrations until their recovery delay ends, unless
+            # their items are back in the report on their own
+            reported_entry_ids = {candidate.config_entry_id for candidate in candidates}
+            for entry_id, record in previous.unavailable_integrations.items():
+                if entry_id in integrations or entry_id in reported_entry_ids:
+                    continue
+                if self._async_recovering(f"{ITEM_INTEGRATION}:{entry_id}", now, recovery_delay, pending):
+                    integrations[entry_id] = record
+                    # Its recovering items stay grouped under it
+                    for key, member_entry_id in previous.integration_members.items():
+                        if member_entry_id == entry_id:
+                            members.setdefault(key, entry_id)
+
+            # Keep recovered devices until their recovery delay ends
+            for devices, previous_devices in (
+                (unavailable_devices, previous.unavailable_devices),
+                (unknown_devices, previous.unknown_devices),
+            ):
+                for device_id, record in previous_devices.items():
+                    if device_id in full_failure_device_ids:
+                        continue
+                    if self._async_recovering(f"{ITEM_DEVICE}:{device_id}", now, recovery_delay, pending):
+                        full_failure_device_ids.add(device_id)
+                        devices[device_id] = record
+
+        # 4. Process Items based on Device Status
+        standalone_unavailable: list[EntityRecord] = []
+        standalone_unknown: list[EntityRecord] = []
+
+        for candidate in candidates:
+            if candidate.device_id in full_failure_device_ids:
+                continue # Already reported as a Device
+
+            # If device is NOT fully unavailable, report the entity separately
+            record = EntityRecord(candidate.entity_id, candidate.since, candidate.is_registered)
+
+            if candidate.state == STATE_UNAVAILABLE:
+                standalone_unavailable.append(record)
+            else:
+                standalone_unknown.append(record)
+
+        if previous is not None:
+            # Keep recovered entities until their recovery delay ends
+            candidate_entity_ids = {candidate.entity_id for candidate in candidates}
+            for entities, previous_entities in (
+                (standalone_unavailable, previous.unavailable_entities),
+                (standalone_unknown, previous.unknown_entities),
+            ):
+                for record in previous_entities:
+                    if record.entity in candidate_entity_ids:
+                        continue
+                    if self._async_recovering(f"{ITEM_ENTITY}:{record.entity}", now, recovery_delay, pending):
+                        entities.append(record)
+
+        if members:
+            # Drop members that are no longer reported at all
+            reported = {f"{ITEM_DEVICE}:{device_id}" for device_id in full_failure_device_ids}
+            reported.update(
+                f"{ITEM_ENTITY}:{record.entity}"
+                for entities in (standalone_unavailable, standalone_unknown)
+                for record in entities
+            )
+            members = {key: entry_id for key, entry_id in members.items() if key in reported}
+
+        # Forget items that came back or finished recovering, and their timers
+        for key in [key for key in self._recovering if key not in pending]:
+            del self._recovering[key]
+        self._async_cancel_timers(pending)
+
+        # Resolve excluded names for attributes
+        excluded_device_names = []
+        for d_id in self.excluded_device_ids:
+            device_name = index.device_name(d_id)
+            if device_name:
+                excluded_device_names.append(device_name)
+            else:
+                excluded_device_names.append(f"Unknown Device ({d_id})")
+
+        return UnavailableReport(
+            unavailable_devices=unavailable_devices,
+            unknown_devices=unknown_devices,
+            unavailable_entities=standalone_unavailable,
+            unknown_entities=standalone_unknown,
+            excluded_devices=excluded_device_names,
+            excluded_entities=list(self.excluded_entity_ids),
+            unavailable_integrations=integrations,
+            integration_members=members,
+        )
+
+    def _collapse_config_entries(
+        self, candidates: list[_Candidate], full_failure_device_ids: set[str]
+    ) -> tuple[dict[str, IntegrationRecord], dict[str, str]]:
+        """Return a row for each config entry that is down as a whole.
+
+        An entry is down when it failed to set up, or when every device it
+        has entities on has fully failed. Its reported devices and standalone
+        entities are then grouped under its row, as long as there are at least
+        as many as the collapse threshold. Also returns the entry each grouped
+        item belongs to, keyed by item key.
+        """
+        device_config_entries: dict[str, str] = {}
+        threshold = self.options.get(CONF_COLLAPSE_THRESHOLD, DEFAULT_COLLAPSE_THRESHOLD)
+        if not threshold:
+            return {}, {}
+
+        devices: dict[str, set[str]] = {}
+        entities: dict[str, int] = {}
+        entry_since: dict[str, float] = {}
+        for candidate in candidates:
+            entry_id = candidate.config_entry_id
+            if entry_id is None:
+                continue
+            device_id = candidate.device_id
+            if device_id in full_failure_device_ids:
+                # A device with entities from several entries goes to the first seen
+                entry_id = device_config_entries.setdefault(device_id, entry_id)
+                devices.setdefault(entry_id, set()).add(device_id)
+            else:
+                entities[entry_id] = entities.get(entry_id, 0) + 1
+            since = entry_since.get(entry_id)
+            if since is None or candidate.since < since:
+                entry_since[entry_id] = candidate.since
+
+        integrations: dict[str, IntegrationRecord] = {}
+        device_counts = self.tracker.device_counts
+        for entry_id, since in entry_since.items():
+            entry_devices = len(devices.get(entry_id, ()))
+            entry_entities = entities.get(entry_id, 0)
+            if entry_devices + entry_entities < threshold:
+                continue
+            config_entry = self.hass.config_entries.async_get_entry(entry_id)
+            if config_entry is None:
+                continue
+            setup_failed = config_entry.state in FAILED_ENTRY_STATES
+            if not setup_failed:
+                counts = [
+                    device_counts[device_id]
+                    for device_id in self.index.entry_device_ids(entry_id)
+                    if device_id in device_counts
+                ]
+                if not counts or any(count.status is None for count in counts):
+                    continue
+            integrations[entry_id] = IntegrationRecord(
+                config_entry.title, config_entry.domain, since, entry_devices, entry_entities, setup_failed
+            )
+        if not integrations:
+            return integrations, {}
+        _LOGGER.debug("Integrations down: %s", list(integrations))
+
+        members: dict[str, str] = {}
+        for candidate in candidates:
+            device_id = candidate.device_id
+            if device_id in full_failure_device_ids:
+                entry_id = device_config_entries.get(device_id)
+                if entry_id in integrations:
+                    members[f"{ITEM_DEVICE}:{device_id}"] = entry_id
+            elif candidate.config_entry_id in integrations:
+                members[f"{ITEM_ENTITY}:{candidate.entity_id}"] = candidate.config_entry_id
+        return integrations, members
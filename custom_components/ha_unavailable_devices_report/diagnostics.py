@@ -0,0 +1,42 @@
+"""Diagnostics support for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+from typing import Any
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN
+from .coordinator import UnavailableDevicesCoordinator
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry."""
+    coordinator: UnavailableDevicesCoordinator = hass.data[DOMAIN][entry.entry_id]
+    report = coordinator.data
+
+    return {
+        "options": dict(entry.options),
+        "ready": coordinator.ready,
+        "tracker": {
+            "unavailable": len(coordinator.tracker.unavailable),
+            "unknown": len(coordinator.tracker.unknown),
+            "devices_counted": len(coordinator.tracker.device_counts),
+        },
+        "report": None if report is None else {
+            "unavailable_integrations": len(report.unavailable_integrations),
+            "unavailable_devices": len(report.unavailable_devices),
+            "unknown_devices": len(report.unknown_devices),
+            "unavailable_entities": len(report.unavailable_entities),
+            "unknown_entities": len(report.unknown_entities),
+            "computed_at": report.computed_at,
+        },
+        "history": {
+            "items": len(coordinator.history.items),
+            "outages_logged": len(coordinator.history.log),
+        },
+        "summary": coordinator.stats.summary(),
+        "cycles": coordinator.stats.as_list(),
+    }
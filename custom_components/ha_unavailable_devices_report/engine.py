@@ -0,0 +1,447 @@
+"""Event-driven tracking of unavailable and unknown entities."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+import logging
+import time
+
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, State, callback
+from homeassistant.helpers import entity_registry as er
+
+from .const import DATA_ENGINE, DEFAULT_SCAN_BUDGET
+from .index import RegistryIndex
+
+_LOGGER = logging.getLogger(__name__)
+
+PROBLEM_STATES = (STATE_UNAVAILABLE, STATE_UNKNOWN)
+IGNORED_ENTITY_CATEGORIES = ("diagnostic", "config")
+
+DEVICE_UNAVAILABLE = "unavailable"
+DEVICE_UNKNOWN = "unknown"
+
+# Long loops check their time budget once every this many items
+YIELD_EVERY = 64
+
+
+def eligible_device_id(entry: er.RegistryEntry | None) -> str | None:
+    """Return the device an entity counts towards, if any.
+
+    Disabled entities and diagnostic/config entities never decide whether a
+    device has failed.
+    """
+    if entry is None or not entry.device_id or entry.disabled_by:
+        return None
+    if entry.entity_category in IGNORED_ENTITY_CATEGORIES:
+        return None
+    return entry.device_id
+
+
+class DeviceCounts:
+    """Running counts of the eligible entities of one device."""
+
+    __slots__ = ("eligible", "unavailable", "unknown")
+
+    def __init__(self) -> None:
+        """Initialize the counts."""
+        self.eligible = 0
+        self.unavailable = 0
+        self.unknown = 0
+
+    @property
+    def status(self) -> str | None:
+        """Return the full-failure status, or None if the device is partially active."""
+        if self.eligible == 0 or self.unavailable + self.unknown != self.eligible:
+            return None
+        # Any truly unavailable entity marks the device as Unavailable (higher severity)
+        return DEVICE_UNAVAILABLE if self.unavailable else DEVICE_UNKNOWN
+
+
+class TimeBudget:
+    """Time slicing for long loops that run on the event loop.
+
+    Loops call async_yield() every YIELD_EVERY items; once the current slice
+    has used up its budget, control goes back to the event loop before the
+    next slice starts. A budget of 0 never yields.
+    """
+
+    __slots__ = ("_budget", "_deadline", "slices")
+
+    def __init__(self, budget_ms: float) -> None:
+        """Initialize the budget and start the first slice."""
+        self._budget = budget_ms / 1000
+        self._deadline = time.perf_counter() + self._budget
+        self.slices = 1
+
+    async def async_yield(self) -> None:
+        """Yield to the event loop if the current slice is used up."""
+        if self._budget <= 0 or time.perf_counter() < self._deadline:
+            return
+        await asyncio.sleep(0)
+        self.slices += 1
+        self._deadline = time.perf_counter() + self._budget
+
+
+class UnavailabilityTracker:
+    """Keep a live set of unavailable and unknown entities.
+
+    The state machine is scanned in full once on start (and optionally as a
+    periodic consistency check). Afterwards membership is maintained from
+    ``state_changed`` events, and listeners are only called when an entity
+    enters or leaves one of the tracked sets.
+
+    Alongside the sets it keeps per-device counts of eligible, unavailable and
+    unknown entities, updated from the same state events and from registry
+    changes reported by the index, so classifying a device is O(1).
+    """
+
+    def __init__(self, hass: HomeAssistant, index: RegistryIndex) -> None:
+        """Initialize the tracker."""
+        self.hass = hass
+        self.index = index
+        self.unavailable: dict[str, State] = {}
+        self.unknown: dict[str, State] = {}
+        self.device_counts: dict[str, DeviceCounts] = {}
+        self._listeners: list[Callable[[], None]] = []
+        self._unsub_state: CALLBACK_TYPE | None = None
+        self._unsub_index: CALLBACK_TYPE | None = None
+        # Entities and devices changed while a cooperative scan is in flight
+        self._dirty_entities: set[str] | None = None
+        self._dirty_devices: set[str] | None = None
+
+    @property
+    def started(self) -> bool:
+        """Return True if the tracker is listening for state changes."""
+        return self._unsub_state is not None
+
+    @callback
+    def async_start(self, full_scan: bool = True) -> None:
+        """Subscribe to state changes and seed membership with a full scan.
+
+        Pass full_scan=False to seed later with async_full_scan_cooperative.
+        """
+        if self._unsub_state is None:
+            self._unsub_state = self.hass.bus.async_listen(
+                EVENT_STATE_CHANGED, self._async_state_changed
+            )
+            self._unsub_index = self.index.async_add_entity_listener(
+                self._async_entity_entry_changed
+            )
+        if full_scan:
+            self.async_full_scan()
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe from state changes."""
+        if self._unsub_state is not None:
+            self._unsub_state()
+            self._unsub_state = None
+        if self._unsub_index is not None:
+            self._unsub_index()
+            self._unsub_index = None
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Register a callback run when membership changes."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_full_scan(self) -> bool:
+        """Rebuild membership from the state machine in one go.
+
+        Returns True if the result differs from the tracked sets, which would
+        mean an event was missed.
+        """
+        unavailable: dict[str, State] = {}
+        unknown: dict[str, State] = {}
+
+        for state in self.hass.states.async_all():
+            _classify_state(state, unavailable, unknown)
+
+        device_counts: dict[str, DeviceCounts] = {}
+        for device_id in self.index.device_ids():
+            counts = self._count_device(device_id, unavailable, unknown)
+            if counts is not None:
+                device_counts[device_id] = counts
+
+        return self._async_apply_scan(unavailable, unknown, device_counts)
+
+    async def async_full_scan_cooperative(self, budget: TimeBudget) -> bool:
+        """Rebuild membership in time-budgeted slices, yielding in between.
+
+        Events keep updating the live sets while the scan yields; the
+        entities and devices they touch are re-read before the result is
+        swapped in, so nothing that changed mid-scan is lost.
+        """
+        self._dirty_entities = set()
+        self._dirty_devices = set()
+        try:
+            unavailable: dict[str, State] = {}
+            unknown: dict[str, State] = {}
+
+            for idx, state in enumerate(self.hass.states.async_all()):
+                _classify_state(state, unavailable, unknown)
+                if not idx % YIELD_EVERY:
+                    await budget.async_yield()
+
+            device_counts: dict[str, DeviceCounts] = {}
+            for idx, device_id in enumerate(self.index.device_ids()):
+                counts = self._count_device(device_id, unavailable, unknown)
+                if counts is not None:
+                    device_counts[device_id] = counts
+                if not idx % YIELD_EVERY:
+                    await budget.async_yield()
+
+            # Reconcile whatever changed while we were yielding
+            dirty_devices = self._dirty_devices
+            for entity_id in self._dirty_entities:
+                unavailable.pop(entity_id, None)
+                unknown.pop(entity_id, None)
+                state = self.hass.states.get(entity_id)
+                if state is not None:
+                    _classify_state(state, unavailable, unknown)
+                device_id = eligible_device_id(self.index.entity_entry(entity_id))
+                if device_id:
+                    dirty_devices.add(device_id)
+            for device_id in dirty_devices:
+                counts = self._count_device(device_id, unavailable, unknown)
+                if counts is None:
+                    device_counts.pop(device_id, None)
+                else:
+                    device_counts[device_id] = counts
+        finally:
+            self._dirty_entities = None
+            self._dirty_devices = None
+
+        return self._async_apply_scan(unavailable, unknown, device_counts)
+
+    @callback
+    def _async_apply_scan(
+        self,
+        unavailable: dict[str, State],
+        unknown: dict[str, State],
+        device_counts: dict[str, DeviceCounts],
+    ) -> bool:
+        """Swap in the result of a full scan."""
+        changed = (
+            unavailable.keys() != self.unavailable.keys()
+            or unknown.keys() != self.unknown.keys()
+        )
+        self.unavailable = unavailable
+        self.unknown = unknown
+        self.device_counts = device_counts
+
+        _LOGGER.debug(
+            "Full scan: %d unavailable, %d unknown (changed: %s)",
+            len(unavailable),
+            len(unknown),
+            changed,
+        )
+        if changed:
+            self._async_notify()
+        return changed
+
+    @callback
+    def _async_state_changed(self, event: Event) -> None:
+        """Update membership from a state_changed event."""
+        new_state: State | None = event.data.get("new_state")
+        old_state: State | None = event.data.get("old_state")
+
+        new_value = new_state.state if new_state else None
+        old_value = old_state.state if old_state else None
+
+        # Fast path: the overwhelming majority of events never touch our sets
+        if new_value not in PROBLEM_STATES and old_value not in PROBLEM_STATES:
+            return
+
+        entity_id = event.data["entity_id"]
+        changed = False
+        if self._dirty_entities is not None:
+            self._dirty_entities.add(entity_id)
+
+        device_id = eligible_device_id(self.index.entity_entry(entity_id))
+        if device_id and device_id in self.device_counts:
+            # Count from our own membership rather than the event's old_state
+            self._async_count_state(device_id, self._state_of(entity_id), -1)
+            self._async_count_state(device_id, new_value, 1)
+
+        if new_value == STATE_UNAVAILABLE:
+            changed |= self.unavailable.get(entity_id) is None
+            self.unavailable[entity_id] = new_state
+        elif self.unavailable.pop(entity_id, None) is not None:
+            changed = True
+
+        if new_value == STATE_UNKNOWN:
+            changed |= self.unknown.get(entity_id) is None
+            self.unknown[entity_id] = new_state
+        elif self.unknown.pop(entity_id, None) is not None:
+            changed = True
+
+        if changed:
+            self._async_notify()
+
+    def device_status(self, device_id: str) -> str | None:
+        """Return DEVICE_UNAVAILABLE, DEVICE_UNKNOWN or None if partially active."""
+        counts = self.device_counts.get(device_id)
+        return counts.status if counts else None
+
+    def _state_of(self, entity_id: str) -> str | None:
+        """Return the tracked problem state of an entity, if any."""
+        if entity_id in self.unavailable:
+            return STATE_UNAVAILABLE
+        if entity_id in self.unknown:
+            return STATE_UNKNOWN
+        return None
+
+    def _count_device(
+        self, device_id: str, unavailable: dict[str, State], unknown: dict[str, State]
+    ) -> DeviceCounts | None:
+        """Count a device from scratch, or return None if it has no eligible entities."""
+        counts = DeviceCounts()
+        for entity_id in self.index.device_entities(device_id):
+            if eligible_device_id(self.index.entity_entry(entity_id)):
+                counts.eligible += 1
+                if entity_id in unavailable:
+                    counts.unavailable += 1
+                elif entity_id in unknown:
+                    counts.unknown += 1
+        return counts if counts.eligible else None
+
+    @callback
+    def _async_count_eligible(self, device_id: str, delta: int) -> None:
+        """Adjust the eligible count of a device, dropping it at zero."""
+        counts = self.device_counts.get(device_id)
+        if counts is None:
+            counts = self.device_counts[device_id] = DeviceCounts()
+        counts.eligible += delta
+        if counts.eligible <= 0:
+            del self.device_counts[device_id]
+
+    @callback
+    def _async_count_state(self, device_id: str, state: str | None, delta: int) -> None:
+        """Adjust the counter matching a problem state; other states are ignored."""
+        if state == STATE_UNAVAILABLE:
+            self.device_counts[device_id].unavailable += delta
+        elif state == STATE_UNKNOWN:
+            self.device_counts[device_id].unknown += delta
+
+    @callback
+    def _async_entity_entry_changed(
+        self,
+        entity_id: str,
+        old_entry: er.RegistryEntry | None,
+        new_entry: er.RegistryEntry | None,
+    ) -> None:
+        """Move an entity's contribution when its registry entry changes."""
+        state = self._state_of(entity_id)
+        old_device_id = eligible_device_id(old_entry)
+        if self._dirty_entities is not None:
+            self._dirty_entities.add(entity_id)
+            if old_device_id:
+                self._dirty_devices.add(old_device_id)
+        if old_device_id and old_device_id in self.device_counts:
+            self._async_count_state(old_device_id, state, -1)
+            self._async_count_eligible(old_device_id, -1)
+        new_device_id = eligible_device_id(new_entry)
+        if new_device_id:
+            self._async_count_eligible(new_device_id, 1)
+            self._async_count_state(new_device_id, state, 1)
+
+    @callback
+    def _async_notify(self) -> None:
+        """Call all registered listeners."""
+        for update_callback in list(self._listeners):
+            update_callback()
+
+
+
+class SharedEngine:
+    """Registry index and tracker shared by every report view.
+
+    All config entries and the YAML sensor of one Home Assistant instance
+    feed from the same index, tracked sets and full scans, so each extra
+    view costs one classification pass but never another scan.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the engine."""
+        self.hass = hass
+        self.index = RegistryIndex(hass)
+        self.tracker = UnavailabilityTracker(hass, self.index)
+        self.last_full_scan = 0.0
+        self._users = 0
+        self._warm_up: asyncio.Task[bool] | None = None
+        self._scan_task: asyncio.Task[bool] | None = None
+
+    @classmethod
+    @callback
+    def async_get(cls, hass: HomeAssistant) -> SharedEngine:
+        """Return the engine of a Home Assistant instance, creating it if needed."""
+        engine: SharedEngine | None = hass.data.get(DATA_ENGINE)
+        if engine is None:
+            engine = hass.data[DATA_ENGINE] = cls(hass)
+        return engine
+
+    @callback
+    def async_add_user(self) -> None:
+        """Register a report view, starting the engine for the first one."""
+        self._users += 1
+        if self._users > 1:
+            return
+        self.index.async_start()
+        # Follow state_changed events now; the seeding scan runs in the background
+        self.tracker.async_start(full_scan=False)
+        self._warm_up = self._async_scan_task(TimeBudget(DEFAULT_SCAN_BUDGET))
+
+    @callback
+    def async_remove_user(self) -> None:
+        """Unregister a report view, stopping the engine after the last one."""
+        self._users -= 1
+        if self._users > 0:
+            return
+        for task in (self._warm_up, self._scan_task):
+            if task is not None:
+                task.cancel()
+        self._warm_up = self._scan_task = None
+        self.tracker.async_stop()
+        self.index.async_stop()
+        if self.hass.data.get(DATA_ENGINE) is self:
+            del self.hass.data[DATA_ENGINE]
+
+    async def async_wait_warm(self) -> None:
+        """Wait until the seeding scan has finished."""
+        if self._warm_up is not None:
+            await asyncio.shield(self._warm_up)
+
+    async def async_full_scan(self, budget: TimeBudget) -> bool:
+        """Run a cooperative full scan, joining one that is already in flight."""
+        return await asyncio.shield(self._async_scan_task(budget))
+
+    @callback
+    def _async_scan_task(self, budget: TimeBudget) -> asyncio.Task[bool]:
+        """Return the in-flight full scan, starting one if there is none."""
+        if self._scan_task is None or self._scan_task.done():
+            self._scan_task = self.hass.async_create_task(self._async_scan(budget))
+        return self._scan_task
+
+    async def _async_scan(self, budget: TimeBudget) -> bool:
+        """Run a full scan and remember when it finished."""
+        changed = await self.tracker.async_full_scan_cooperative(budget)
+        self.last_full_scan = time.monotonic()
+        return changed
+
+def _classify_state(
+    state: State, unavailable: dict[str, State], unknown: dict[str, State]
+) -> None:
+    """Add a state to the set matching its value, if any."""
+    if state.state == STATE_UNAVAILABLE:
+        unavailable[state.entity_id] = state
+    elif state.state == STATE_UNKNOWN:
+        unknown[state.entity_id] = state
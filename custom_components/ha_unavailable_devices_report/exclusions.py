@@ -0,0 +1,172 @@
+"""Compiled exclusion rules."""
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Mapping
+import fnmatch
+import re
+from typing import Any
+
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from .const import (
+    CONF_EXCLUDED_AREAS,
+    CONF_EXCLUDED_DEVICES,
+    CONF_EXCLUDED_ENTITIES,
+    CONF_EXCLUDED_INTEGRATIONS,
+    CONF_EXCLUDED_PATTERNS,
+    CONF_VIEW_AREAS,
+    CONF_VIEW_FLOORS,
+    CONF_VIEW_INTEGRATIONS,
+    CONF_VIEW_LABELS,
+)
+
+REGEX_PREFIX = "re:"
+
+
+def compile_patterns(patterns: Iterable[str]) -> re.Pattern[str] | None:
+    """Compile entity ID patterns into a single regular expression.
+
+    Patterns are globs (``sensor.*_battery``) unless prefixed with ``re:``, in
+    which case the rest is a regular expression matched against the whole
+    entity ID. Raises re.error for an invalid expression.
+    """
+    parts = []
+    for pattern in patterns:
+        pattern = pattern.strip()
+        if not pattern:
+            continue
+        if pattern.startswith(REGEX_PREFIX):
+            expression = pattern[len(REGEX_PREFIX):]
+            # Compile on its own first so the error points at the culprit
+            re.compile(expression)
+            parts.append(f"(?:{expression})")
+        else:
+            parts.append(fnmatch.translate(pattern))
+    if not parts:
+        return None
+    return re.compile("|".join(f"(?:{part})\\Z" for part in parts))
+
+
+class ExclusionMatcher:
+    """All exclusion rules, compiled once into sets and one regex.
+
+    Checking an item is a handful of hash lookups plus at most one regex
+    match, regardless of how many rules are configured.
+    """
+
+    def __init__(
+        self,
+        device_ids: Iterable[str] = (),
+        entity_ids: Iterable[str] = (),
+        patterns: Iterable[str] = (),
+        integrations: Iterable[str] = (),
+        areas: Iterable[str] = (),
+    ) -> None:
+        """Compile the rules."""
+        self.device_ids = frozenset(device_ids)
+        # Entity exclusions double as device names for legacy YAML exclusions
+        self.entity_ids = frozenset(entity_ids)
+        self.integrations = frozenset(integrations)
+        self.areas = frozenset(areas)
+        self.pattern = compile_patterns(patterns)
+
+    @classmethod
+    def from_options(
+        cls, options: Mapping[str, Any], yaml_exclusions: Iterable[str] = ()
+    ) -> ExclusionMatcher:
+        """Build a matcher from config entry options and YAML exclusions."""
+        return cls(
+            device_ids=options.get(CONF_EXCLUDED_DEVICES, []),
+            entity_ids=[*options.get(CONF_EXCLUDED_ENTITIES, []), *yaml_exclusions],
+            patterns=options.get(CONF_EXCLUDED_PATTERNS, []),
+            integrations=options.get(CONF_EXCLUDED_INTEGRATIONS, []),
+            areas=options.get(CONF_EXCLUDED_AREAS, []),
+        )
+
+    def match(
+        self,
+        entity_id: str,
+        entity_entry: er.RegistryEntry | None,
+        device_id: str | None,
+        device_name: str | None,
+        device_area_id: str | None,
+    ) -> str | None:
+        """Return why an item is excluded, or None if it is not."""
+        if entity_id in self.entity_ids:
+            return "entity"
+        if device_id and device_id in self.device_ids:
+            return "device"
+        if device_name and device_name in self.entity_ids:
+            return "device name"
+        if self.pattern is not None and self.pattern.match(entity_id):
+            return "pattern"
+        if entity_entry is not None:
+            if entity_entry.platform in self.integrations:
+                return "integration"
+            area_id = entity_entry.area_id or device_area_id
+        else:
+            area_id = device_area_id
+        if area_id and area_id in self.areas:
+            return "area"
+        return None
+
+
+class ViewFilter:
+    """Include rules that narrow a report view down to part of the house.
+
+    An item must match every configured rule; a filter without rules
+    includes everything.
+    """
+
+    def __init__(
+        self,
+        areas: Iterable[str] = (),
+        floors: Iterable[str] = (),
+        integrations: Iterable[str] = (),
+        labels: Iterable[str] = (),
+    ) -> None:
+        """Compile the rules."""
+        self.areas = frozenset(areas)
+        self.floors = frozenset(floors)
+        self.integrations = frozenset(integrations)
+        self.labels = frozenset(labels)
+
+    @classmethod
+    def from_options(cls, options: Mapping[str, Any]) -> ViewFilter:
+        """Build a filter from config entry options."""
+        return cls(
+            areas=options.get(CONF_VIEW_AREAS, []),
+            floors=options.get(CONF_VIEW_FLOORS, []),
+            integrations=options.get(CONF_VIEW_INTEGRATIONS, []),
+            labels=options.get(CONF_VIEW_LABELS, []),
+        )
+
+    def __bool__(self) -> bool:
+        """Return True if the filter has any rules."""
+        return bool(self.areas or self.floors or self.integrations or self.labels)
+
+    def match(
+        self,
+        entity_entry: er.RegistryEntry | None,
+        device_entry: dr.DeviceEntry | None,
+        area_floor_id: Callable[[str | None], str | None],
+    ) -> bool:
+        """Return True if an item belongs to the view."""
+        if entity_entry is None:
+            # Without a registry entry there is nothing to filter on
+            return not self
+        if self.integrations and entity_entry.platform not in self.integrations:
+            return False
+        if self.areas or self.floors:
+            area_id = entity_entry.area_id or (device_entry.area_id if device_entry else None)
+            if self.areas and area_id not in self.areas:
+                return False
+            if self.floors and area_floor_id(area_id) not in self.floors:
+                return False
+        if self.labels:
+            labels = set(entity_entry.labels)
+            if device_entry is not None:
+                labels.update(device_entry.labels)
+            if labels.isdisjoint(self.labels):
+                return False
+        return True
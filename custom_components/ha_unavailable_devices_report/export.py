@@ -0,0 +1,280 @@
+"""Full report export for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable, Mapping
+import csv
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, TextIO
+
+from homeassistant.core import HomeAssistant, callback
+
+from .const import (
+    CONF_DURATION_GRANULARITY,
+    CONF_EXPORT_KEEP,
+    CONF_EXPORT_MAX_SIZE,
+    DEFAULT_EXPORT_KEEP,
+    DEFAULT_EXPORT_MAX_SIZE,
+    DOMAIN,
+)
+from .models import ITEM_DEVICE, ITEM_ENTITY, ITEM_INTEGRATION, ReportItem
+from .report import GRANULARITY_MINUTE, format_duration, isoformat, markdown_row, sorted_items
+
+if TYPE_CHECKING:
+    from .coordinator import UnavailableReport
+
+_LOGGER = logging.getLogger(__name__)
+
+EXPORT_FORMAT_JSONL = "jsonl"
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_MARKDOWN = "markdown"
+EXPORT_FORMATS = [EXPORT_FORMAT_JSONL, EXPORT_FORMAT_CSV, EXPORT_FORMAT_MARKDOWN]
+_EXTENSIONS = {
+    EXPORT_FORMAT_JSONL: "jsonl",
+    EXPORT_FORMAT_CSV: "csv",
+    EXPORT_FORMAT_MARKDOWN: "md",
+}
+
+_MARKDOWN_SECTIONS = {
+    ITEM_INTEGRATION: "🔌 Integrations Down",
+    ITEM_DEVICE: "📱 Devices",
+    ITEM_ENTITY: "👻 Standalone Entities",
+}
+
+CSV_FIELDS = ["computed_at", "type", "id", "name", "state", "since", "duration", "is_registered"]
+
+
+class ReportExporter:
+    """Writes full report snapshots to files under the config directory.
+
+    Files are written in the executor: each snapshot streams into a temporary
+    file that is renamed over the previous one, which is kept as a numbered
+    rotation first. A snapshot whose items did not change since the last
+    write of the same file is skipped.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the exporter for one report, keyed by its config entry ID."""
+        self.hass = hass
+        self.directory = Path(hass.config.path(DOMAIN))
+        # Titles are not unique, and views sharing a file would overwrite each other
+        self.name = key
+        self._fingerprints: dict[str, str] = {}
+        self._lock = asyncio.Lock()
+        self._pending: tuple[UnavailableReport, list[str], Mapping[str, Any]] | None = None
+        self._task: asyncio.Task | None = None
+
+    def path(self, export_format: str) -> Path:
+        """Return the file a format is exported to."""
+        return self.directory / f"{self.name}.{_EXTENSIONS[export_format]}"
+
+    async def async_export(
+        self,
+        report: UnavailableReport,
+        formats: Iterable[str],
+        options: Mapping[str, Any],
+        force: bool = False,
+    ) -> list[dict[str, Any]]:
+        """Export a report in each format and describe the files."""
+        # Report items are immutable, so the executor can read them safely
+        items = sorted_items(report.items().values())
+        granularity = options.get(CONF_DURATION_GRANULARITY, GRANULARITY_MINUTE)
+        keep = int(options.get(CONF_EXPORT_KEEP, DEFAULT_EXPORT_KEEP))
+        max_bytes = int(options.get(CONF_EXPORT_MAX_SIZE, DEFAULT_EXPORT_MAX_SIZE)) * 1024 * 1024
+
+        results: list[dict[str, Any]] = []
+        async with self._lock:
+            fingerprint = await self.hass.async_add_executor_job(snapshot_fingerprint, items)
+            for export_format in formats:
+                path = self.path(export_format)
+                result = {
+                    "format": export_format,
+                    "path": str(path),
+                    "items": len(items),
+                    "written": False,
+                }
+                results.append(result)
+                if not force and self._fingerprints.get(export_format) == fingerprint:
+                    _LOGGER.debug("Export to %s unchanged, skipping", path)
+                    continue
+                result["bytes"] = await self.hass.async_add_executor_job(
+                    write_snapshot,
+                    path,
+                    _WRITERS[export_format],
+                    items,
+                    report.computed_at,
+                    granularity,
+                    keep,
+                    max_bytes,
+                )
+                result["written"] = True
+                self._fingerprints[export_format] = fingerprint
+                _LOGGER.debug("Exported %d items to %s", len(items), path)
+        return results
+
+    @callback
+    def async_schedule(
+        self, report: UnavailableReport, formats: list[str], options: Mapping[str, Any]
+    ) -> None:
+        """Export a report in the background.
+
+        While an export runs, only the newest report waits for the next one.
+        """
+        self._pending = (report, formats, options)
+        if self._task is None:
+            self._task = self.hass.async_create_task(self._async_run_pending())
+
+    @callback
+    def async_cancel(self) -> None:
+        """Drop the pending export and stop waiting for the running one."""
+        self._pending = None
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    async def _async_run_pending(self) -> None:
+        """Export pending reports until none is left."""
+        try:
+            while self._pending is not None:
+                report, formats, options = self._pending
+                self._pending = None
+                try:
+                    await self.async_export(report, formats, options)
+                except OSError as err:
+                    _LOGGER.warning("Failed to export the report: %s", err)
+        finally:
+            self._task = None
+
+
+def snapshot_fingerprint(items: list[ReportItem]) -> str:
+    """Return a digest of the report items, independent of their durations."""
+    digest = hashlib.blake2b(digest_size=16)
+    for item in items:
+        digest.update(json.dumps(item).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def write_snapshot(
+    path: Path,
+    writer: Callable[[TextIO, list[ReportItem], float, str], None],
+    items: list[ReportItem],
+    computed_at: float,
+    granularity: str,
+    keep: int,
+    max_bytes: int,
+) -> int:
+    """Stream a snapshot into place and return its size.
+
+    Runs in the executor. The previous file survives a failed write.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    try:
+        with tmp.open("w", encoding="utf-8", newline="") as file:
+            writer(file, items, computed_at, granularity)
+            file.flush()
+            os.fsync(file.fileno())
+        size = tmp.stat().st_size
+        _rotate(path, keep)
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+    _enforce_caps(path, keep, max_bytes - size)
+    return size
+
+
+def _rotate(path: Path, keep: int) -> None:
+    """Keep the current file as the first rotation, shifting older ones up."""
+    if not keep or not path.exists():
+        return
+    for number in range(keep, 1, -1):
+        older = path.with_name(f"{path.name}.{number - 1}")
+        if older.exists():
+            os.replace(older, path.with_name(f"{path.name}.{number}"))
+    first = path.with_name(f"{path.name}.1")
+    first.unlink(missing_ok=True)
+    try:
+        # A hard link keeps the current file in place until the new one replaces it
+        os.link(path, first)
+    except OSError:
+        os.replace(path, first)
+
+
+def _enforce_caps(path: Path, keep: int, max_bytes: int) -> None:
+    """Delete rotations beyond the count or once they exceed the byte cap."""
+    rotations: list[tuple[int, Path]] = []
+    for rotated in path.parent.glob(f"{path.name}.*"):
+        suffix = rotated.name[len(path.name) + 1:]
+        if suffix.isdigit():
+            rotations.append((int(suffix), rotated))
+    rotations.sort()
+
+    remaining = max_bytes
+    for number, rotated in rotations:
+        size = rotated.stat().st_size
+        if number > keep or size > remaining:
+            rotated.unlink(missing_ok=True)
+            remaining = -1
+            continue
+        remaining -= size
+
+
+def _row(item: ReportItem, computed_at: float) -> dict[str, Any]:
+    """Return an item as an export row."""
+    return {
+        "computed_at": isoformat(computed_at),
+        "type": item.type,
+        "id": item.id,
+        "name": item.name,
+        "state": item.state,
+        "since": isoformat(item.since),
+        "duration": int(computed_at - item.since),
+        "is_registered": item.is_registered,
+    }
+
+
+def _write_jsonl(
+    file: TextIO, items: list[ReportItem], computed_at: float, granularity: str
+) -> None:
+    """Write one JSON object per item."""
+    for item in items:
+        file.write(json.dumps(_row(item, computed_at), ensure_ascii=False))
+        file.write("\n")
+
+
+def _write_csv(
+    file: TextIO, items: list[ReportItem], computed_at: float, granularity: str
+) -> None:
+    """Write a header and one CSV row per item."""
+    writer = csv.DictWriter(file, fieldnames=CSV_FIELDS)
+    writer.writeheader()
+    for item in items:
+        writer.writerow(_row(item, computed_at))
+
+
+def _write_markdown(
+    file: TextIO, items: list[ReportItem], computed_at: float, granularity: str
+) -> None:
+    """Write the report as a markdown document with one line per item."""
+    file.write(f"# Unavailable Devices Report\n\n_Computed at {isoformat(computed_at)}_\n")
+    if not items:
+        file.write("\n✅ No unavailable devices or entities.\n")
+        return
+    section = None
+    for item in items:
+        if item.type != section:
+            section = item.type
+            file.write(f"\n## {_MARKDOWN_SECTIONS[item.type]}\n\n")
+        file.write(markdown_row(item, format_duration(computed_at - item.since, granularity)))
+        file.write("\n")
+
+
+_WRITERS: dict[str, Callable[[TextIO, list[ReportItem], float, str], None]] = {
+    EXPORT_FORMAT_JSONL: _write_jsonl,
+    EXPORT_FORMAT_CSV: _write_csv,
+    EXPORT_FORMAT_MARKDOWN: _write_markdown,
+}
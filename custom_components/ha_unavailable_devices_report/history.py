@@ -0,0 +1,218 @@
+"""Persistent outage history for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import ReportItem
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+# Seconds to batch history changes before writing them to disk
+SAVE_DELAY = 30
+# Items with statistics; the least recently active ones are evicted first
+MAX_HISTORY_ITEMS = 2000
+# Most recent closed outages kept in the log
+MAX_HISTORY_OUTAGES = 1000
+# Window used for the flap rate, and the most outage starts kept for it
+FLAP_WINDOW = 86400
+MAX_FLAP_STARTS = 50
+
+HISTORY_SORT_KEYS = ["outages", "downtime", "flap_rate", "mtbf"]
+
+
+@dataclass(slots=True)
+class ItemHistory:
+    """Rolling outage statistics of one device or standalone entity."""
+
+    name: str | None
+    outages: int = 0
+    downtime: float = 0.0
+    first_start: float | None = None
+    last_start: float | None = None
+    last_change: float = 0.0
+    open_since: float | None = None
+    recent_starts: list[float] = field(default_factory=list)
+
+    def start(self, since: float) -> None:
+        """Record the start of an outage."""
+        self.outages += 1
+        if self.first_start is None:
+            self.first_start = since
+        self.last_start = since
+        self.open_since = since
+        self.last_change = since
+        self.recent_starts.append(since)
+        cutoff = since - FLAP_WINDOW
+        while self.recent_starts and (
+            self.recent_starts[0] < cutoff or len(self.recent_starts) > MAX_FLAP_STARTS
+        ):
+            self.recent_starts.pop(0)
+
+    def end(self, now: float) -> float:
+        """Record the end of the open outage and return its start."""
+        start = self.open_since
+        self.downtime += max(now - start, 0.0)
+        self.open_since = None
+        self.last_change = now
+        return start
+
+    def total_downtime(self, now: float) -> float:
+        """Return the downtime including the open outage."""
+        if self.open_since is None:
+            return self.downtime
+        return self.downtime + max(now - self.open_since, 0.0)
+
+    def mtbf(self) -> float | None:
+        """Return the mean time between failures in seconds.
+
+        This is the time spent up between the first and the latest outage
+        start, divided by the number of gaps between them. It is None until
+        a second outage has started.
+        """
+        if self.outages < 2 or self.first_start is None or self.last_start is None:
+            return None
+        # The latest outage lies after the span, so its downtime is left out
+        downtime = self.downtime
+        if self.open_since is None:
+            downtime -= max(self.last_change - self.last_start, 0.0)
+        uptime = max(self.last_start - self.first_start - downtime, 0.0)
+        return uptime / (self.outages - 1)
+
+    def flap_rate(self, now: float) -> int:
+        """Return the number of outages started within the flap window."""
+        cutoff = now - FLAP_WINDOW
+        return sum(1 for start in self.recent_starts if start >= cutoff)
+
+    def as_dict(self, now: float) -> dict[str, Any]:
+        """Return the statistics as JSON-ready data."""
+        mtbf = self.mtbf()
+        return {
+            "name": self.name,
+            "outages": self.outages,
+            "downtime": round(self.total_downtime(now)),
+            "mtbf": None if mtbf is None else round(mtbf),
+            "flap_rate": self.flap_rate(now),
+            "open_since": self.open_since,
+        }
+
+
+class OutageHistory:
+    """Outage log and per-item statistics, persisted with a Store.
+
+    The history follows the report: an item appearing starts an outage and
+    an item disappearing ends it. Statistics are updated incrementally and
+    both the item table and the outage log are bounded.
+    """
+
+    def __init__(self, hass: HomeAssistant, key: str) -> None:
+        """Initialize the history."""
+        self._store: Store[dict[str, Any]] = Store(
+            hass, STORAGE_VERSION, f"{DOMAIN}.history.{key}"
+        )
+        self.items: dict[str, ItemHistory] = {}
+        self.log: deque[tuple[str, float, float]] = deque(maxlen=MAX_HISTORY_OUTAGES)
+        self._open: set[str] = set()
+
+    async def async_load(self) -> None:
+        """Load the history from disk."""
+        data = await self._store.async_load()
+        if not data:
+            return
+        for key, values in data.get("items", {}).items():
+            self.items[key] = ItemHistory(**values)
+        self.log.extend(tuple(outage) for outage in data.get("log", []))
+        self._open = {key for key, item in self.items.items() if item.open_since is not None}
+        _LOGGER.debug("Loaded outage history for %d items", len(self.items))
+
+    async def async_save(self) -> None:
+        """Write the history to disk now."""
+        await self._store.async_save(self._data_to_save())
+
+    async def async_remove(self) -> None:
+        """Delete the stored history."""
+        await self._store.async_remove()
+
+    @callback
+    def async_update(self, items: dict[str, ReportItem], now: float | None = None) -> None:
+        """Start and end outages from the current report items."""
+        now = time.time() if now is None else now
+        changed = False
+
+        for key in [key for key in self._open if key not in items]:
+            start = self.items[key].end(now)
+            self._open.discard(key)
+            self.log.append((key, start, now))
+            changed = True
+
+        for key, item in items.items():
+            if key in self._open:
+                continue
+            history = self.items.get(key)
+            if history is None:
+                history = self.items[key] = ItemHistory(item.name)
+            else:
+                history.name = item.name
+            history.start(item.since)
+            self._open.add(key)
+            changed = True
+
+        if not changed:
+            return
+        self._async_evict()
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    def top_offenders(
+        self, sort_by: str = "outages", limit: int = 10, now: float | None = None
+    ) -> list[dict[str, Any]]:
+        """Return the items with the highest value of a statistic."""
+        now = time.time() if now is None else now
+        rows = [{"key": key, **item.as_dict(now)} for key, item in self.items.items()]
+        if sort_by == "mtbf":
+            # A short time between failures is the worst; items that failed
+            # only once have none and come last
+            rows.sort(key=lambda row: (row["mtbf"] is None, row["mtbf"] or 0))
+        else:
+            rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:limit]
+
+    @callback
+    def _async_evict(self) -> None:
+        """Drop the least recently active closed items above the size bound."""
+        excess = len(self.items) - MAX_HISTORY_ITEMS
+        if excess <= 0:
+            return
+        closed = sorted(
+            (item.last_change, key)
+            for key, item in self.items.items()
+            if item.open_since is None
+        )
+        for _, key in closed[:excess]:
+            del self.items[key]
+
+    def _data_to_save(self) -> dict[str, Any]:
+        """Return the history as stored data."""
+        return {
+            "items": {
+                key: {
+                    "name": item.name,
+                    "outages": item.outages,
+                    "downtime": item.downtime,
+                    "first_start": item.first_start,
+                    "last_start": item.last_start,
+                    "last_change": item.last_change,
+                    "open_since": item.open_since,
+                    "recent_starts": item.recent_starts,
+                }
+                for key, item in self.items.items()
+            },
+            "log": list(self.log),
+        }
@@ -0,0 +1,205 @@
+"""Cached device and entity registry index."""
+from __future__ import annotations
+
+from collections.abc import Callable
+import logging
+
+from homeassistant.core import CALLBACK_TYPE, Event, HomeAssistant, callback
+from homeassistant.helpers import (
+    area_registry as ar,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+# Called with (entity_id, old_entry, new_entry) when an indexed entity changes
+EntityChangeCallback = Callable[[str, "er.RegistryEntry | None", "er.RegistryEntry | None"], None]
+
+
+class RegistryIndex:
+    """Device -> entities and config entry -> devices index, and device entry cache.
+
+    Built once from the registries, then kept current from
+    ``entity_registry_updated`` and ``device_registry_updated`` events so
+    report scans never have to walk the registries.
+    """
+
+    def __init__(self, hass: HomeAssistant) -> None:
+        """Initialize the index."""
+        self.hass = hass
+        self._entries: dict[str, er.RegistryEntry] = {}
+        self._device_entities: dict[str, set[str]] = {}
+        # Config entry -> device -> number of the entry's entities on it
+        self._entry_devices: dict[str, dict[str, int]] = {}
+        self._devices: dict[str, dr.DeviceEntry | None] = {}
+        self._entity_listeners: list[EntityChangeCallback] = []
+        self._listeners: list[Callable[[], None]] = []
+        self._unsubs: list[CALLBACK_TYPE] = []
+
+    @callback
+    def async_start(self) -> None:
+        """Build the index and subscribe to registry updates."""
+        if self._unsubs:
+            return
+        self._async_rebuild()
+        self._unsubs = [
+            self.hass.bus.async_listen(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, self._async_entity_registry_updated
+            ),
+            self.hass.bus.async_listen(
+                dr.EVENT_DEVICE_REGISTRY_UPDATED, self._async_device_registry_updated
+            ),
+        ]
+
+    @callback
+    def async_stop(self) -> None:
+        """Unsubscribe from registry updates."""
+        while self._unsubs:
+            self._unsubs.pop()()
+
+    @callback
+    def async_add_listener(self, update_callback: Callable[[], None]) -> CALLBACK_TYPE:
+        """Register a callback run after any indexed registry change."""
+        self._listeners.append(update_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._listeners.remove(update_callback)
+
+        return remove_listener
+
+    @callback
+    def async_add_entity_listener(self, change_callback: EntityChangeCallback) -> CALLBACK_TYPE:
+        """Register a callback run with the old and new entry of a changed entity."""
+        self._entity_listeners.append(change_callback)
+
+        @callback
+        def remove_listener() -> None:
+            self._entity_listeners.remove(change_callback)
+
+        return remove_listener
+
+    def entity_entry(self, entity_id: str) -> er.RegistryEntry | None:
+        """Return the cached registry entry of an entity."""
+        return self._entries.get(entity_id)
+
+    def device_entities(self, device_id: str) -> set[str]:
+        """Return the IDs of all registered entities of a device."""
+        return self._device_entities.get(device_id, set())
+
+    def entry_device_ids(self, config_entry_id: str) -> list[str]:
+        """Return the IDs of the devices a config entry has entities on."""
+        return list(self._entry_devices.get(config_entry_id, ()))
+
+    def device_ids(self) -> list[str]:
+        """Return the IDs of all devices that have registered entities."""
+        return list(self._device_entities)
+
+    def device_entry(self, device_id: str) -> dr.DeviceEntry | None:
+        """Return the registry entry of a device, caching the lookup."""
+        try:
+            return self._devices[device_id]
+        except KeyError:
+            pass
+        device_entry = self._devices[device_id] = dr.async_get(self.hass).async_get(device_id)
+        return device_entry
+
+    def device_name(self, device_id: str) -> str | None:
+        """Return the display name of a device."""
+        device_entry = self.device_entry(device_id)
+        if device_entry is None:
+            return None
+        return device_entry.name_by_user or device_entry.name
+
+    def device_area_id(self, device_id: str | None) -> str | None:
+        """Return the area of a device."""
+        device_entry = self.device_entry(device_id) if device_id else None
+        return device_entry.area_id if device_entry else None
+
+    def area_floor_id(self, area_id: str | None) -> str | None:
+        """Return the floor of an area."""
+        area_entry = ar.async_get(self.hass).async_get_area(area_id) if area_id else None
+        return area_entry.floor_id if area_entry else None
+
+    @callback
+    def _async_rebuild(self) -> None:
+        """Build the whole index from the entity registry."""
+        self._entries = {}
+        self._device_entities = {}
+        self._entry_devices = {}
+        self._devices = {}
+        for entry in er.async_get(self.hass).entities.values():
+            self._async_add_entry(entry)
+        _LOGGER.debug(
+            "Registry index built: %d entities on %d devices",
+            len(self._entries),
+            len(self._device_entities),
+        )
+
+    @callback
+    def _async_add_entry(self, entry: er.RegistryEntry) -> None:
+        """Add a registry entry to the index."""
+        self._entries[entry.entity_id] = entry
+        if entry.device_id:
+            self._device_entities.setdefault(entry.device_id, set()).add(entry.entity_id)
+            if entry.config_entry_id:
+                devices = self._entry_devices.setdefault(entry.config_entry_id, {})
+                devices[entry.device_id] = devices.get(entry.device_id, 0) + 1
+
+    @callback
+    def _async_remove_entry(self, entity_id: str) -> er.RegistryEntry | None:
+        """Remove an entity from the index and return its old entry."""
+        entry = self._entries.pop(entity_id, None)
+        if entry and entry.device_id:
+            entity_ids = self._device_entities.get(entry.device_id)
+            if entity_ids is not None:
+                entity_ids.discard(entity_id)
+                if not entity_ids:
+                    del self._device_entities[entry.device_id]
+            devices = self._entry_devices.get(entry.config_entry_id)
+            if devices is not None and entry.device_id in devices:
+                devices[entry.device_id] -= 1
+                if not devices[entry.device_id]:
+                    del devices[entry.device_id]
+                if not devices:
+                    del self._entry_devices[entry.config_entry_id]
+        return entry
+
+    @callback
+    def _async_entity_registry_updated(self, event: Event) -> None:
+        """Apply a single entity registry change to the index."""
+        action = event.data["action"]
+        entity_id = event.data["entity_id"]
+
+        changes: list[tuple[str, er.RegistryEntry | None, er.RegistryEntry | None]] = []
+
+        old_entity_id = event.data.get("old_entity_id")
+        if old_entity_id and old_entity_id != entity_id:
+            changes.append((old_entity_id, self._async_remove_entry(old_entity_id), None))
+
+        old_entry = self._async_remove_entry(entity_id)
+        new_entry = None
+        if action != "remove":
+            new_entry = er.async_get(self.hass).async_get(entity_id)
+            if new_entry:
+                self._async_add_entry(new_entry)
+        changes.append((entity_id, old_entry, new_entry))
+
+        for changed_id, old, new in changes:
+            for change_callback in list(self._entity_listeners):
+                change_callback(changed_id, old, new)
+        self._async_notify()
+
+    @callback
+    def _async_device_registry_updated(self, event: Event) -> None:
+        """Invalidate cached device data."""
+        # Lookups of unknown devices are cached as None, so creates invalidate too
+        self._devices.pop(event.data["device_id"], None)
+        self._async_notify()
+
+    @callback
+    def _async_notify(self) -> None:
+        """Call all registered listeners."""
+        for update_callback in list(self._listeners):
+            update_callback()
@@ -0,0 +1,49 @@
+"""Compact records used by the report pipeline."""
+from __future__ import annotations
+
+from typing import Any, NamedTuple
+
+ITEM_DEVICE = "device"
+ITEM_ENTITY = "entity"
+ITEM_INTEGRATION = "integration"
+
+
+class DeviceRecord(NamedTuple):
+    """A fully failed device."""
+
+    name: str | None
+    since: float
+
+
+class EntityRecord(NamedTuple):
+    """A standalone unavailable or unknown entity."""
+
+    entity: str
+    since: float
+    is_registered: bool
+
+
+class IntegrationRecord(NamedTuple):
+    """A config entry that is down as a whole, standing in for its items."""
+
+    name: str
+    domain: str
+    since: float
+    devices: int
+    entities: int
+    setup_failed: bool
+
+
+class ReportItem(NamedTuple):
+    """A reported device or entity, flattened for services and subscribers."""
+
+    type: str
+    id: str
+    name: str | None
+    state: str
+    since: float
+    is_registered: bool
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the item as JSON-ready data."""
+        return self._asdict()
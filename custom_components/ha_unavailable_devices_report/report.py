@@ -0,0 +1,465 @@
+"""Helpers for building the report attributes."""
+from __future__ import annotations
+
+import bisect
+from collections.abc import Callable, Iterable, Iterator
+from datetime import datetime, timezone
+import hashlib
+import json
+from typing import Any
+
+from .models import (
+    ITEM_DEVICE,
+    ITEM_ENTITY,
+    ITEM_INTEGRATION,
+    DeviceRecord,
+    EntityRecord,
+    IntegrationRecord,
+    ReportItem,
+)
+
+# Byte limit of a single markdown page attribute
+MAX_PAGE_BYTES = 2048
+# Attribute holding how many items of each list were left out
+DROPPED_ATTRIBUTE = "dropped"
+
+# Order of the item types in flat listings
+_TYPE_ORDER = {ITEM_INTEGRATION: 0, ITEM_DEVICE: 1, ITEM_ENTITY: 2}
+
+GRANULARITY_SECOND = "second"
+GRANULARITY_MINUTE = "minute"
+GRANULARITY_HOUR = "hour"
+GRANULARITY_DAY = "day"
+DURATION_GRANULARITIES = [GRANULARITY_SECOND, GRANULARITY_MINUTE, GRANULARITY_HOUR, GRANULARITY_DAY]
+_GRANULARITY_SECONDS = {
+    GRANULARITY_SECOND: 1,
+    GRANULARITY_MINUTE: 60,
+    GRANULARITY_HOUR: 3600,
+    GRANULARITY_DAY: 86400,
+}
+
+
+def encode_report(value: Any, attributes: dict[str, Any], available: bool = True) -> bytes:
+    """Return the sensor state, attributes and availability as canonical JSON."""
+    return json.dumps(
+        [value, available, attributes], sort_keys=True, separators=(",", ":"), default=str
+    ).encode("utf-8")
+
+
+def report_fingerprint(payload: bytes) -> str:
+    """Return a stable digest of an encoded report.
+
+    Two reports with the same fingerprint render identically, so the state
+    write (and the recorder row it creates) can be skipped.
+    """
+    return hashlib.blake2b(payload, digest_size=16).hexdigest()
+
+
+def isoformat(timestamp: float) -> str:
+    """Return an epoch timestamp as an ISO 8601 UTC string."""
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def format_duration(seconds: float, granularity: str = GRANULARITY_MINUTE) -> str:
+    """Format an outage duration, rounded down to the given granularity.
+
+    Coarser buckets change less often, so the rendered report (and its
+    fingerprint) stays the same for longer while the outage set is stable.
+    """
+    seconds = max(int(seconds), 0)
+    unit = _GRANULARITY_SECONDS.get(granularity, 60)
+    if seconds < unit:
+        return f"<1{granularity[0]}"
+
+    if seconds < 60:
+        return f"{seconds}s"
+
+    minutes = seconds // 60
+    if minutes < 60:
+        return f"{minutes}m"
+
+    hours = minutes // 60
+    if hours < 24:
+        if unit >= 3600:
+            return f"{hours}h"
+        return f"{hours}h {minutes % 60}m"
+
+    days = hours // 24
+    if unit >= 86400:
+        return f"{days}d"
+    return f"{days}d {hours % 24}h"
+
+
+def split_utf8(line: str, max_bytes: int) -> Iterator[str]:
+    """Split a line into chunks of at most max_bytes without breaking characters."""
+    data = line.encode("utf-8")
+    start = 0
+    while start < len(data):
+        end = min(start + max_bytes, len(data))
+        # Back off continuation bytes (0b10xxxxxx) so we cut on a character boundary
+        while end < len(data) and end > start and data[end] & 0xC0 == 0x80:
+            end -= 1
+        if end == start:
+            # max_bytes is smaller than one character; emit it whole
+            end = start + 1
+            while end < len(data) and data[end] & 0xC0 == 0x80:
+                end += 1
+        yield data[start:end].decode("utf-8")
+        start = end
+
+
+def iter_pages(lines: Iterable[str], max_bytes: int = MAX_PAGE_BYTES) -> Iterator[list[str]]:
+    """Group lines into pages that render to at most max_bytes.
+
+    Sizes are tracked as a running byte count, so paging is linear in the
+    input. Each page starts with the newline render_page puts in front and
+    each line ends with one. Lines that do not fit on a page of their own are
+    split at UTF-8 character boundaries.
+    """
+    page: list[str] = []
+    size = 1
+    for line in lines:
+        line_bytes = len(line.encode("utf-8")) + 1
+        if line_bytes + 1 > max_bytes:
+            chunks = list(split_utf8(line, max_bytes - 2))
+        else:
+            chunks = [line]
+        for chunk in chunks:
+            chunk_bytes = line_bytes if len(chunks) == 1 else len(chunk.encode("utf-8")) + 1
+            if page and size + chunk_bytes > max_bytes:
+                yield page
+                page = []
+                size = 1
+            page.append(chunk)
+            size += chunk_bytes
+    if page:
+        yield page
+
+
+def render_page(page: list[str]) -> str:
+    """Return the attribute text of a page."""
+    return "\n" + "".join(f"{line}\n" for line in page)
+
+
+def json_size(value: Any) -> int:
+    """Return the UTF-8 size of a value serialized as compact JSON."""
+    return len(
+        json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+    )
+
+
+class AttributePlanner:
+    """Fits state attributes into one serialized JSON byte budget.
+
+    The size of each value is measured once as it is added and kept as a
+    running total, so the attribute dict is never serialized as a whole.
+    Lists and pages take items in order until the next one does not fit;
+    how many were left out is recorded under ``dropped``. Room for those
+    counts and for the page counts is reserved up front, so they are always
+    present.
+    """
+
+    def __init__(
+        self, budget: int, droppable: Iterable[str], page_counts: Iterable[str] = ()
+    ) -> None:
+        """Initialize the planner for the attributes that may be cut short."""
+        self.attributes: dict[str, Any] = {}
+        self.dropped: dict[str, int] = {}
+        # Every attribute pays for its colon and a comma; the reserve covers
+        # the braces, the dropped counts and the page counts at ten digits each
+        reserve = json_size({DROPPED_ATTRIBUTE: dict.fromkeys(droppable, 10**9)})
+        reserve += sum(json_size(key) + json_size(10**9) + 2 for key in page_counts)
+        self.remaining = budget - reserve
+
+    def add(self, key: str, value: Any) -> None:
+        """Add an attribute that is always kept."""
+        self.remaining -= json_size(key) + json_size(value) + 2
+        self.attributes[key] = value
+
+    def add_list(self, key: str, items: Iterable[Any], total: int) -> int:
+        """Add as many items of a list as fit and return how many did."""
+        kept: list[Any] = []
+        # Key, colon, brackets and the comma before the attribute
+        remaining = self.remaining - json_size(key) - 4
+        if remaining >= 0:
+            for item in items:
+                size = json_size(item) + (1 if kept else 0)
+                if size > remaining:
+                    break
+                remaining -= size
+                kept.append(item)
+            self.remaining = remaining
+            self.attributes[key] = kept
+        if len(kept) < total:
+            self.dropped[key] = total - len(kept)
+        return len(kept)
+
+    def add_pages(self, sections: Iterable[tuple[str, str, Iterable[list[str]]]]) -> None:
+        """Add numbered page attributes while they fit and store the page counts.
+
+        Sections are given as (prefix, count key, pages). The first page of
+        every section goes in before any second page, so one long report does
+        not crowd out the others. Pages are only rendered until the first one
+        of a section that does not fit; the rest are counted. Each count key
+        must be one of the page counts the planner reserved room for, and
+        holds the number of pages published.
+        """
+        sections = [(prefix, count_key, iter(pages)) for prefix, count_key, pages in sections]
+        kept = dict.fromkeys((count_key for _, count_key, _ in sections), 0)
+        skipped = dict.fromkeys(kept, 0)
+        for first in (True, False):
+            for prefix, count_key, pages in sections:
+                if skipped[count_key]:
+                    continue
+                for page in pages:
+                    key = f"{prefix}_{kept[count_key] + 1}"
+                    text = render_page(page)
+                    size = json_size(key) + json_size(text) + 2
+                    if size > self.remaining:
+                        skipped[count_key] = 1
+                        break
+                    self.remaining -= size
+                    self.attributes[key] = text
+                    kept[count_key] += 1
+                    if first:
+                        break
+        for _, count_key, pages in sections:
+            if skipped[count_key]:
+                skipped[count_key] += sum(1 for _ in pages)
+                self.dropped[count_key] = skipped[count_key]
+            # Hand back the part of the reserved count that is not needed
+            self.remaining += json_size(10**9) - json_size(kept[count_key])
+            self.attributes[count_key] = kept[count_key]
+
+    def finish(self) -> dict[str, Any]:
+        """Return the planned attributes including the dropped counts."""
+        self.attributes[DROPPED_ATTRIBUTE] = self.dropped
+        return self.attributes
+
+
+def device_row(device_id: str, row: tuple) -> str:
+    """Render a device line from (name, duration)."""
+    name, duration = row
+    return f"- [{name}](/config/devices/device/{device_id}) _({duration})_"
+
+
+def entity_row(entity_id: str, row: tuple) -> str:
+    """Render an entity line from (duration, is_registered)."""
+    duration, is_registered = row
+    if is_registered:
+        return f"- [{entity_id}](/config/entities/entity/{entity_id}) _({duration})_"
+    return f"- {entity_id} _({duration})_"
+
+
+def integration_row(entry_id: str, row: tuple) -> str:
+    """Render a config entry line from (name, domain, summary, duration)."""
+    name, domain, summary, duration = row
+    if domain:
+        return f"- [{name}](/config/integrations/integration/{domain}) — {summary} _({duration})_"
+    return f"- {name} — {summary} _({duration})_"
+
+
+def integration_summary(record: IntegrationRecord) -> str:
+    """Describe what an integration row stands for."""
+    parts = []
+    if record.setup_failed:
+        parts.append("setup failed")
+    if record.devices:
+        parts.append(f"{record.devices} devices")
+    if record.entities:
+        parts.append(f"{record.entities} entities")
+    return ", ".join(parts)
+
+
+def sorted_items(items: Iterable[ReportItem]) -> list[ReportItem]:
+    """Return items grouped by type, oldest outage first."""
+    return sorted(items, key=lambda item: (_TYPE_ORDER[item.type], item.since, item.id))
+
+
+def markdown_row(item: ReportItem, duration: str) -> str:
+    """Render a flat report item as a markdown line."""
+    if item.type == ITEM_INTEGRATION:
+        return integration_row(item.id, (item.name, None, "integration down", duration))
+    if item.type == ITEM_DEVICE:
+        return device_row(item.id, (item.name, duration))
+    return entity_row(item.id, (duration, item.is_registered))
+
+
+class SectionRenderer:
+    """One report section that keeps its rendered lines between scans.
+
+    Rows are kept sorted with bisect insertion, and a row's markdown line is
+    only regenerated when the data it is rendered from changes.
+    """
+
+    def __init__(self, title: str, render: Callable[[str, tuple], str]) -> None:
+        """Initialize the section."""
+        self.title = title
+        self._render = render
+        self._order: list[tuple[str, str]] = []
+        self._rows: dict[str, tuple[str, tuple, str]] = {}
+
+    def __bool__(self) -> bool:
+        """Return True if the section has any rows."""
+        return bool(self._rows)
+
+    def update(self, rows: dict[str, tuple[str, tuple]]) -> None:
+        """Apply the current rows, given as {item_id: (sort_key, row)}."""
+        for item_id in [item_id for item_id in self._rows if item_id not in rows]:
+            self._remove(item_id)
+
+        for item_id, (sort_key, row) in rows.items():
+            cached = self._rows.get(item_id)
+            if cached is not None:
+                if cached[1] == row and cached[0] == sort_key:
+                    continue
+                if cached[0] != sort_key:
+                    self._remove(item_id)
+                    cached = None
+            if cached is None:
+                bisect.insort(self._order, (sort_key, item_id))
+            self._rows[item_id] = (sort_key, row, self._render(item_id, row))
+
+    def _remove(self, item_id: str) -> None:
+        """Drop a row from the section."""
+        sort_key, _, _ = self._rows.pop(item_id)
+        position = bisect.bisect_left(self._order, (sort_key, item_id))
+        del self._order[position]
+
+    def lines(self) -> Iterator[str]:
+        """Yield the title and the rows in sorted order."""
+        yield self.title
+        rows = self._rows
+        for _, item_id in self._order:
+            yield rows[item_id][2]
+
+
+class ReportRenderer:
+    """Renders the devices and entities reports from cached sections."""
+
+    def __init__(self) -> None:
+        """Initialize the renderer."""
+        self.unavailable_integrations = SectionRenderer("**🔌 Integrations Down**", integration_row)
+        self.unavailable_devices = SectionRenderer("**📱 Unavailable Devices**", device_row)
+        self.unknown_devices = SectionRenderer("**📱 Unknown Devices**", device_row)
+        self.unavailable_entities = SectionRenderer("**👻 Standalone Entities**", entity_row)
+        self.unknown_entities = SectionRenderer("**👻 Unknown Entities**", entity_row)
+
+    def update(
+        self,
+        unavail_devs: dict[str, DeviceRecord],
+        unknown_devs: dict[str, DeviceRecord],
+        unavail_ents: list[EntityRecord],
+        unknown_ents: list[EntityRecord],
+        now: float,
+        granularity: str = GRANULARITY_MINUTE,
+        integrations: dict[str, IntegrationRecord] | None = None,
+        members: dict[str, str] | None = None,
+    ) -> None:
+        """Bring the sections in line with the current report.
+
+        Durations are rendered here from each item's ``since`` timestamp, so a
+        row only changes when its duration moves into a new bucket. Devices
+        and entities in ``members`` are shown by their integration's row only.
+        """
+        members = members or {}
+        self.unavailable_integrations.update(_integration_rows(integrations or {}, now, granularity))
+        self.unavailable_devices.update(_device_rows(shown_devices(unavail_devs, members), now, granularity))
+        self.unknown_devices.update(_device_rows(shown_devices(unknown_devs, members), now, granularity))
+        self.unavailable_entities.update(_entity_rows(shown_entities(unavail_ents, members), now, granularity))
+        self.unknown_entities.update(_entity_rows(shown_entities(unknown_ents, members), now, granularity))
+
+    def devices_lines(self) -> Iterator[str]:
+        """Yield the markdown lines of the devices report."""
+        if (
+            not self.unavailable_integrations
+            and not self.unavailable_devices
+            and not self.unknown_devices
+        ):
+            yield "✅ No unavailable devices."
+            return
+        yield from _join_sections(
+            self.unavailable_integrations, self.unavailable_devices, self.unknown_devices
+        )
+
+    def entities_lines(self) -> Iterator[str]:
+        """Yield the markdown lines of the standalone entities report."""
+        if not self.unavailable_entities and not self.unknown_entities:
+            yield "✅ No standalone unavailable entities."
+            return
+        yield from _join_sections(self.unavailable_entities, self.unknown_entities)
+
+
+def shown_devices(
+    devices: dict[str, DeviceRecord], members: dict[str, str]
+) -> dict[str, DeviceRecord]:
+    """Return the devices not grouped under an integration row."""
+    if not members:
+        return devices
+    return {
+        d_id: device for d_id, device in devices.items() if f"{ITEM_DEVICE}:{d_id}" not in members
+    }
+
+
+def shown_entities(entities: list[EntityRecord], members: dict[str, str]) -> list[EntityRecord]:
+    """Return the entities not grouped under an integration row."""
+    if not members:
+        return entities
+    return [ent for ent in entities if f"{ITEM_ENTITY}:{ent.entity}" not in members]
+
+
+def _device_rows(
+    devices: dict[str, DeviceRecord], now: float, granularity: str
+) -> dict[str, tuple[str, tuple]]:
+    """Return section rows for devices; unnamed devices are not listed."""
+    return {
+        d_id: (
+            device.name,
+            (device.name, format_duration(now - device.since, granularity)),
+        )
+        for d_id, device in devices.items()
+        if device.name is not None
+    }
+
+
+def _integration_rows(
+    integrations: dict[str, IntegrationRecord], now: float, granularity: str
+) -> dict[str, tuple[str, tuple]]:
+    """Return section rows for config entries that are down."""
+    return {
+        entry_id: (
+            record.name,
+            (
+                record.name,
+                record.domain,
+                integration_summary(record),
+                format_duration(now - record.since, granularity),
+            ),
+        )
+        for entry_id, record in integrations.items()
+    }
+
+
+def _entity_rows(
+    entities: list[EntityRecord], now: float, granularity: str
+) -> dict[str, tuple[str, tuple]]:
+    """Return section rows for standalone entities."""
+    return {
+        ent.entity: (
+            ent.entity,
+            (format_duration(now - ent.since, granularity), ent.is_registered),
+        )
+        for ent in entities
+    }
+
+
+def _join_sections(*sections: SectionRenderer) -> Iterator[str]:
+    """Yield non-empty sections separated by a blank line."""
+    first = True
+    for section in sections:
+        if not section:
+            continue
+        if not first:
+            yield ""
+        first = False
+        yield from section.lines()
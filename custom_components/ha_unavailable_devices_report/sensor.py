@@ -1,21 +1,28 @@
 import logging
 import voluptuous as vol
-from datetime import datetime, timedelta
+from collections.abc import Callable
+from typing import Any
+from contextlib import nullcontext
 
-import json
-import asyncio
-from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorEntity
+import time
+from homeassistant.components.sensor import PLATFORM_SCHEMA, SensorDeviceClass, SensorEntity, SensorStateClass
 from homeassistant.helpers.entity import DeviceInfo
-from homeassistant.const import CONF_EXCLUDE
-from homeassistant.core import HomeAssistant, callback, CoreState
-from homeassistant.helpers import config_validation as cv, device_registry as dr, entity_registry as er
+from homeassistant.const import CONF_EXCLUDE, EVENT_HOMEASSISTANT_STOP, EntityCategory, UnitOfTime
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.helpers.typing import ConfigType, DiscoveryInfoType
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.util import dt as dt_util
-from homeassistant.helpers.event import async_track_time_interval
 
-from .const import DOMAIN, CONF_EXCLUDED_DEVICES, CONF_EXCLUDED_ENTITIES, CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL, CONF_IGNORE_UNKNOWN
+from .const import DOMAIN, DEFAULT_NAME, YAML_ENTRY_ID, CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS, CONF_DURATION_GRANULARITY, CONF_ATTRIBUTE_BUDGET, DEFAULT_ATTRIBUTE_BUDGET, CONF_ATTRIBUTE_PRIORITY, ATTRIBUTE_GROUPS, ATTRIBUTE_GROUP_IDS, ATTRIBUTE_GROUP_PAGES, ATTRIBUTE_GROUP_DEVICES, ATTRIBUTE_GROUP_ENTITIES, ATTRIBUTE_GROUP_EXCLUDED
+from .api import async_setup_http
+from .coordinator import UnavailableDevicesCoordinator, UnavailableReport
+from .engine import SharedEngine
+from .services import async_setup_services
+from .websocket import async_setup_websocket
+from .report import GRANULARITY_MINUTE, AttributePlanner, ReportRenderer, encode_report, isoformat, iter_pages, report_fingerprint, shown_devices, shown_entities
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -23,6 +30,34 @@ PLATFORM_SCHEMA = PLATFORM_SCHEMA.extend({
     vol.Optional(CONF_EXCLUDE, default=[]): vol.All(cv.ensure_list, [cv.string]),
 })
 
+# Page attributes are numbered, so the recorder needs every name up front.
+# Reports longer than this many pages still work, later pages are just recorded.
+MAX_UNRECORDED_PAGES = 200
+
+# Seconds between state writes of the scan duration sensor; a cycle runs
+# every scan interval and its timing jitters, so most cycles are not written
+SCAN_DURATION_WRITE_INTERVAL = 600
+
+# Attributes the planner may cut short; page groups are counted by page
+PLANNED_ATTRIBUTES = (
+    "unavailable_device_ids",
+    "unknown_device_ids",
+    "unavailable_entity_ids",
+    "unknown_entity_ids",
+    "devices_pages",
+    "entities_pages",
+    "unavailable_integrations",
+    "unavailable_devices",
+    "unknown_devices",
+    "unavailable_entities",
+    "unknown_entities",
+    "excluded_devices",
+    "excluded_entities",
+)
+
+# Page counts are always published, even when no page fits
+PAGE_COUNT_ATTRIBUTES = ("devices_pages", "entities_pages")
+
 async def async_setup_platform(
     hass: HomeAssistant,
     config: ConfigType,
@@ -31,7 +66,22 @@ async def async_setup_platform(
 ) -> None:
     """Set up the sensor platform from YAML."""
     exclusions = config.get(CONF_EXCLUDE)
-    async_add_entities([UnavailableDevicesSensor(hass, yaml_exclusions=exclusions)], True)
+    coordinator = UnavailableDevicesCoordinator(
+        hass, SharedEngine.async_get(hass), yaml_exclusions=exclusions
+    )
+    coordinator.async_start()
+    # Registered like a config entry so services, websocket and HTTP see it
+    hass.data.setdefault(DOMAIN, {})[YAML_ENTRY_ID] = coordinator
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    async_setup_http(hass)
+
+    async def _async_shutdown(event) -> None:
+        hass.data.get(DOMAIN, {}).pop(YAML_ENTRY_ID, None)
+        await coordinator.async_shutdown()
+
+    hass.bus.async_listen_once(EVENT_HOMEASSISTANT_STOP, _async_shutdown)
+    async_add_entities(_build_entities(coordinator))
 
 async def async_setup_entry(
     hass: HomeAssistant,
@@ -39,519 +89,352 @@ async def async_setup_entry(
     async_add_entities: AddEntitiesCallback,
 ) -> None:
     """Set up the sensor platform from a config entry."""
-    async_add_entities([UnavailableDevicesSensor(hass, config_entry=entry)], True)
-
-class UnavailableDevicesSensor(SensorEntity):
+    coordinator: UnavailableDevicesCoordinator = hass.data[DOMAIN][entry.entry_id]
+    async_add_entities(_build_entities(coordinator))
+
+def _build_entities(coordinator: UnavailableDevicesCoordinator) -> list[SensorEntity]:
+    """Return the report sensor and its lightweight count sensors."""
+    return [
+        UnavailableDevicesSensor(coordinator),
+        UnavailableCountSensor(
+            coordinator,
+            "unavailable_devices",
+            "Unavailable Devices Count",
+            "mdi:devices",
+            lambda report: len(report.unavailable_devices),
+        ),
+        UnavailableCountSensor(
+            coordinator,
+            "unknown_devices",
+            "Unknown Devices Count",
+            "mdi:help-circle",
+            lambda report: len(report.unknown_devices),
+        ),
+        UnavailableCountSensor(
+            coordinator,
+            "standalone_entities",
+            "Standalone Entities Count",
+            "mdi:ghost",
+            lambda report: report.entity_count,
+        ),
+        ScanDurationSensor(coordinator),
+    ]
+
+def _device_info(coordinator: UnavailableDevicesCoordinator) -> DeviceInfo:
+    """Return the device all report entities belong to."""
+    return DeviceInfo(
+        identifiers={(DOMAIN, coordinator.entry.entry_id if coordinator.entry else YAML_ENTRY_ID)},
+        name=coordinator.entry.title if coordinator.entry else DEFAULT_NAME,
+        manufacturer="Custom Component",
+        model="Report Sensor",
+    )
+
+class UnavailableDevicesSensor(CoordinatorEntity[UnavailableDevicesCoordinator], SensorEntity):
     """Representation of the Unavailable Devices Sensor."""
 
     _attr_name = "Unavailable Devices Report"
     _attr_icon = "mdi:check-circle"
 
-    def __init__(
-        self, 
-        hass: HomeAssistant, 
-        yaml_exclusions: list[str] | None = None, 
-        config_entry: ConfigEntry | None = None
-    ) -> None:
+    # The report lists and pages are only useful live; keep them out of the
+    # recorder and leave history to the count sensors.
+    _unrecorded_attributes = frozenset({
+        "unavailable_integrations",
+        "unavailable_devices",
+        "unknown_devices",
+        "unavailable_device_ids",
+        "unknown_device_ids",
+        "unavailable_entities",
+        "unknown_entities",
+        "unavailable_entity_ids",
+        "unknown_entity_ids",
+        "excluded_devices",
+        "excluded_entities",
+        "report_page_1",
+        *(f"{prefix}_{idx}" for prefix in ("devices_page", "entities_page") for idx in range(1, MAX_UNRECORDED_PAGES + 1)),
+    })
+
+    def __init__(self, coordinator: UnavailableDevicesCoordinator) -> None:
         """Initialize the sensor."""
-        self.hass = hass
-        self._yaml_exclusions = yaml_exclusions or []
-        self._config_entry = config_entry
+        super().__init__(coordinator)
         self._attr_native_value = 0
         self._attr_extra_state_attributes = {
-            "report_page_1": "✅ **System Initializing...**\nPlease wait ~60s for the first report.",
+            "report_page_1": "✅ **System Initializing...**\nThe first report appears once Home Assistant has started.",
             "report_pages": 1,
             "devices_page_1": "✅ **System Initializing...**", 
             "devices_pages": 1,
             "entities_page_1": "✅ **System Initializing...**",
             "entities_pages": 1,
         }
-        self._startup_delay_complete = False
-        
-        if config_entry:
-            self._attr_unique_id = f"{config_entry.entry_id}"
-            interval = config_entry.options.get(CONF_SCAN_INTERVAL, DEFAULT_SCAN_INTERVAL)
-            self._scan_interval = timedelta(seconds=interval)
-            _LOGGER.debug(f"Initialized with config_entry. Interval: {interval}s ({self._scan_interval}). Options: {config_entry.options}")
+        self._last_fingerprint: str | None = None
+        self._renderer = ReportRenderer()
+        self._last_write = 0.0
+        self._attr_device_info = _device_info(coordinator)
+
+        if coordinator.entry:
+            # Each report view is named after its config entry
+            self._attr_name = coordinator.entry.title
+            self._attr_unique_id = f"{coordinator.entry.entry_id}"
         else:
             self._attr_unique_id = "unavailable_devices_report_sensor"
-            self._scan_interval = timedelta(seconds=DEFAULT_SCAN_INTERVAL)
-            _LOGGER.debug(f"Initialized with YAML/Default. Interval: {DEFAULT_SCAN_INTERVAL}s")
-            
-        self._attr_should_poll = False
 
     async def async_added_to_hass(self) -> None:
         """Handle entity which will be added."""
         await super().async_added_to_hass()
-        # Schedule the startup delay
-        self.hass.loop.create_task(self._startup_delay_timer())
-        
-        # Setup periodic update
-        self.async_on_remove(
-            async_track_time_interval(self.hass, self._async_update_interval, self._scan_interval)
-        )
+        if self.coordinator.data is not None:
+            self._async_render(self.coordinator.data)
 
-    async def _async_update_interval(self, now):
-        """Update the entity on interval."""
-        await self.async_update()
-        self.async_write_ha_state()
-
-    async def _startup_delay_timer(self):
-        """Wait for startup delay to complete."""
-        if self.hass.state == CoreState.running:
-            _LOGGER.debug("Home Assistant is already running. Skipping startup delay.")
-        else:
-            _LOGGER.debug("Waiting 60s for Home Assistant startup...")
-            await asyncio.sleep(60)
-            
-        self._startup_delay_complete = True
-        await self.async_update()
-        self.async_write_ha_state()
+    @property
+    def duration_granularity(self) -> str:
+        """Return the bucket size durations are rendered with."""
+        return self.coordinator.options.get(CONF_DURATION_GRANULARITY, GRANULARITY_MINUTE)
 
     @property
-    def device_info(self) -> DeviceInfo:
-        """Return device information."""
-        return DeviceInfo(
-            identifiers={(DOMAIN, self._config_entry.entry_id if self._config_entry else "yaml_config")},
-            name="Unavailable Devices Report",
-            manufacturer="Custom Component",
-            model="Report Sensor",
-        )
+    def attribute_budget(self) -> int:
+        """Return the bytes the serialized attributes may take."""
+        return int(self.coordinator.options.get(CONF_ATTRIBUTE_BUDGET, DEFAULT_ATTRIBUTE_BUDGET))
 
     @property
-    def excluded_device_ids(self) -> list[str]:
-        """Return excluded device IDs."""
-        if self._config_entry:
-            return self._config_entry.options.get(CONF_EXCLUDED_DEVICES, [])
-        return []
+    def attribute_priority(self) -> list[str]:
+        """Return the attribute groups in the order they are filled.
+
+        Groups missing from the option are filled last, in default order.
+        """
+        priority = [
+            group for group in self.coordinator.options.get(CONF_ATTRIBUTE_PRIORITY, [])
+            if group in ATTRIBUTE_GROUPS
+        ]
+        return [*priority, *(group for group in ATTRIBUTE_GROUPS if group not in priority)]
 
     @property
-    def excluded_entity_ids(self) -> list[str]:
-        """Return excluded entity IDs."""
-        if self._config_entry:
-            return self._config_entry.options.get(CONF_EXCLUDED_ENTITIES, [])
-        return self._yaml_exclusions
-
-    def _get_duration_string(self, last_changed: datetime) -> str:
-        """Format duration since last_changed."""
-        delta = dt_util.utcnow() - last_changed
-        seconds = int(delta.total_seconds())
-        
-        if seconds < 60:
-            return f"{seconds}s"
-        
-        minutes = seconds // 60
-        if minutes < 60:
-            return f"{minutes}m"
-        
-        hours = minutes // 60
-        if hours < 24:
-            return f"{hours}h {minutes % 60}m"
-        
-        days = hours // 24
-        return f"{days}d {hours % 24}h"
-
-    async def async_update(self) -> None:
-        """Fetch new state data for the sensor."""
-        _LOGGER.debug("Starting unavailable devices check")
-        
-        if not self._startup_delay_complete:
-            _LOGGER.debug("Skipping check - startup delay active")
+    def max_staleness(self) -> int:
+        """Return seconds after which an unchanged report is written anyway."""
+        return self.coordinator.options.get(CONF_MAX_STALENESS, DEFAULT_MAX_STALENESS)
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Render the new report and write the state if it changed."""
+        if self.coordinator.data is None:
+            return
+        self._async_render(self.coordinator.data)
+        self._async_write_if_changed()
+
+    @callback
+    def _async_write_if_changed(self) -> None:
+        """Write the state unless the report is identical to the last one written."""
+        # A failed or recovered refresh changes only the availability
+        payload = encode_report(
+            self._attr_native_value, self._attr_extra_state_attributes, self.available
+        )
+        fingerprint = report_fingerprint(payload)
+        now = time.monotonic()
+        max_staleness = self.max_staleness
+
+        cycle = self.coordinator.stats.last
+        if cycle is not None:
+            cycle.payload_bytes = len(payload)
+            cycle.written = False
+
+        if fingerprint == self._last_fingerprint and (
+            not max_staleness or now - self._last_write < max_staleness
+        ):
+            _LOGGER.debug("Report unchanged, skipping state write")
             return
 
-        dev_reg = dr.async_get(self.hass)
-        ent_reg = er.async_get(self.hass)
-        
-        unavailable_items = []
-        
-        # Check ignore_unknown option
-        ignore_unknown = False
-        if self._config_entry:
-            ignore_unknown = self._config_entry.options.get(CONF_IGNORE_UNKNOWN, False)
-
-        # Iterate over all states
-        for state in self.hass.states.async_all():
-            if state.state in ["unavailable", "unknown"]:
-                if state.state == "unknown" and ignore_unknown:
-                     continue
-
-                entity_id = state.entity_id
-
-                # Check entity registry
-                entity_entry = ent_reg.async_get(entity_id)
-                
-                # Filter out Diagnostic and Config entities
-                if entity_entry and entity_entry.entity_category in ["diagnostic", "config"]:
-                    continue
-
-                # Resolve Device Info
-                device_id = None
-                device_name = None
-                
-                # Check entity registry for device_id
-                if entity_entry and entity_entry.device_id:
-                    device_id = entity_entry.device_id
-                    device_entry = dev_reg.async_get(device_id)
-                    if device_entry:
-                        device_name = device_entry.name_by_user or device_entry.name
-                
-                is_reg = False
-                if entity_entry:
-                    # Only consider registered if not hidden and not disabled
-                    if not entity_entry.hidden_by and not entity_entry.disabled_by:
-                        is_reg = True
-
-                unavailable_items.append({
-                    "entity": entity_id,
-                    "state": state.state,
-                    "device_id": device_id,
-                    "device_name": device_name,
-                    "duration": self._get_duration_string(state.last_changed),
-                    "is_registered": is_reg
-                })
-        
-        _LOGGER.debug(f"Found {len(unavailable_items)} total unavailable items/entities")
-        _LOGGER.debug(f"Unavailable items details: {unavailable_items}")
-
-        # Process Report
-        # 1. Collect Valid Candidates
-        candidate_items = [] 
-        candidate_device_ids = set()
-        candidate_device_info = {} # { device_id: {name, duration} }
-        count = 0 
-
-        excluded_dev_ids = self.excluded_device_ids
-        excluded_ent_ids = self.excluded_entity_ids
-        
-        for item in unavailable_items:
-            entity = item['entity']
-            device_name = item['device_name']
-            device_id = item['device_id']
-            duration = item['duration']
-            
-            # Check Exclusions
-            if entity in excluded_ent_ids:
-                _LOGGER.debug(f"Excluding entity: {entity}")
-                continue
-            
-            if device_id and device_id in excluded_dev_ids:
-                _LOGGER.debug(f"Excluding device by ID: {device_id} ({device_name})")
-                continue
-
-            # Handle case where device name might be in YAML exclusions
-            if device_name and device_name in excluded_ent_ids:
-                _LOGGER.debug(f"Excluding device by name (from exclusions): {device_name}")
-                continue
-            
-            if device_id:
-                candidate_device_ids.add(device_id)
-                if device_id not in candidate_device_info:
-                    candidate_device_info[device_id] = {"name": device_name, "duration": duration}
-            
-            candidate_items.append(item)
-        
-        # 2. Identify Full Device Failures
-        full_failure_device_ids = set()
-        unavailable_devices = {} # { device_id: {name, duration} }
-        unknown_devices = {}     # { device_id: {name, duration} }
-        
-        for device_id in candidate_device_ids:
-            # Get all entities for this device
-            device_entries = er.async_entries_for_device(ent_reg, device_id)
-            total_entities = 0
-            unavailable_count = 0
-            unknown_count = 0
-            
-            for entry in device_entries:
-                if entry.disabled_by:
-                    continue
-                
-                # Check if this entity is ignored (diagnostic/config)
-                if entry.entity_category in ["diagnostic", "config"]:
-                    continue
-
-                total_entities += 1
-                state = self.hass.states.get(entry.entity_id)
-                # If state exists and is unavailable/unknown
-                if state:
-                    if state.state == "unavailable":
-                        unavailable_count += 1
-                    elif state.state == "unknown":
-                        unknown_count += 1
-            
-            # Full failure if all entities are either unavailable or unknown
-            if total_entities > 0 and (unavailable_count + unknown_count) == total_entities:
-                 full_failure_device_ids.add(device_id)
-                 
-                 # If ANY entity is truly unavailable, mark device as Unavailable (higher severity)
-                 # Otherwise (all unknown), mark as Unknown
-                 if unavailable_count > 0:
-                    unavailable_devices[device_id] = candidate_device_info[device_id]
-                 else:
-                    unknown_devices[device_id] = candidate_device_info[device_id]
-                 
-                 count += 1
-            else:
-                # Partial Device Failure
-                _LOGGER.debug(f"Device {candidate_device_info[device_id]['name']} is partially active.")
-
-        # 3. Process Items based on Device Status
-        standalone_unavailable = []
-        standalone_unknown = []
-
-        for item in candidate_items:
-            device_id = item['device_id']
-            if device_id in full_failure_device_ids:
-                continue # Already reported as a Device
-            
-            # If device is NOT fully unavailable, report the entity separately
-            data = {
-                "entity": item['entity'], 
-                "duration": item['duration'], 
-                "is_registered": item.get("is_registered", False)
-            }
-            
-            if item['state'] == "unavailable":
-                standalone_unavailable.append(data)
-            else:
-                standalone_unknown.append(data)
-
-        count += len(standalone_unavailable) + len(standalone_unknown)
-
-        # Format Markdown Reports
-        def format_markdown(unavail_devs, unknown_devs, unavail_ents, unknown_ents):
-            if not unavail_devs and not unknown_devs and not unavail_ents and not unknown_ents:
-                return "✅ **All systems operational.** No unavailable devices."
-            
-            res = ""
-            
-            # 1. Unavailable Devices
-            if unavail_devs:
-                res += "**📱 Unavailable Devices**\n"
-                sorted_devs = sorted(
-                    [(d_id, d_info) for d_id, d_info in unavail_devs.items() if d_info["name"] is not None], 
-                    key=lambda x: x[1]["name"]
-                )
-                for d_id, d_info in sorted_devs:
-                    res += f"- [{d_info['name']}](/config/devices/device/{d_id}) _({d_info['duration']})_\n"
-                res += "\n"
-
-            # 2. Unknown Devices
-            if unknown_devs:
-                res += "**📱 Unknown Devices**\n"
-                sorted_devs = sorted(
-                    [(d_id, d_info) for d_id, d_info in unknown_devs.items() if d_info["name"] is not None], 
-                    key=lambda x: x[1]["name"]
-                )
-                for d_id, d_info in sorted_devs:
-                    res += f"- [{d_info['name']}](/config/devices/device/{d_id}) _({d_info['duration']})_\n"
-                res += "\n"
-
-            # 3. Unavailable Entities
-            if unavail_ents:
-                res += "**👻 Standalone Entities**\n"
-                for ent_info in sorted(unavail_ents, key=lambda x: x["entity"]):
-                    if ent_info.get("is_registered", False):
-                        res += f"- [{ent_info['entity']}](/config/entities/entity/{ent_info['entity']}) _({ent_info['duration']})_\n"
-                    else:
-                        res += f"- {ent_info['entity']} _({ent_info['duration']})_\n"
-                res += "\n"
-
-            # 4. Unknown Entities
-            if unknown_ents:
-                res += "**👻 Unknown Entities**\n"
-                for ent_info in sorted(unknown_ents, key=lambda x: x["entity"]):
-                    if ent_info.get("is_registered", False):
-                        res += f"- [{ent_info['entity']}](/config/entities/entity/{ent_info['entity']}) _({ent_info['duration']})_\n"
-                    else:
-                        res += f"- {ent_info['entity']} _({ent_info['duration']})_\n"
-                res += "\n"
-                
-            return res.strip()
-
-        def format_devices_only(unavail_devs, unknown_devs):
-            if not unavail_devs and not unknown_devs:
-                return "✅ No unavailable devices."
-            res = ""
-            
-            if unavail_devs:
-                res += "**📱 Unavailable Devices**\n"
-                sorted_devs = sorted(
-                    [(d_id, d_info) for d_id, d_info in unavail_devs.items() if d_info["name"] is not None], 
-                    key=lambda x: x[1]["name"]
-                )
-                for d_id, d_info in sorted_devs:
-                    res += f"- [{d_info['name']}](/config/devices/device/{d_id}) _({d_info['duration']})_\n"
-                res += "\n"
-                
-            if unknown_devs:
-                res += "**📱 Unknown Devices**\n"
-                sorted_devs = sorted(
-                    [(d_id, d_info) for d_id, d_info in unknown_devs.items() if d_info["name"] is not None], 
-                    key=lambda x: x[1]["name"]
-                )
-                for d_id, d_info in sorted_devs:
-                    res += f"- [{d_info['name']}](/config/devices/device/{d_id}) _({d_info['duration']})_\n"
-                res += "\n"
-                
-            return res.strip()
-
-        def format_entities_only(unavail_ents, unknown_ents):
-            if not unavail_ents and not unknown_ents:
-                return "✅ No standalone unavailable entities."
-            res = ""
-            
-            if unavail_ents:
-                res += "**👻 Standalone Entities**\n"
-                for ent_info in sorted(unavail_ents, key=lambda x: x["entity"]):
-                    if ent_info.get("is_registered", False):
-                        res += f"- [{ent_info['entity']}](/config/entities/entity/{ent_info['entity']}) _({ent_info['duration']})_\n"
-                    else:
-                        res += f"- {ent_info['entity']} _({ent_info['duration']})_\n"
-                res += "\n"
-                
-            if unknown_ents:
-                res += "**👻 Unknown Entities**\n"
-                for ent_info in sorted(unknown_ents, key=lambda x: x["entity"]):
-                    if ent_info.get("is_registered", False):
-                        res += f"- [{ent_info['entity']}](/config/entities/entity/{ent_info['entity']}) _({ent_info['duration']})_\n"
-                    else:
-                        res += f"- {ent_info['entity']} _({ent_info['duration']})_\n"
-                res += "\n"
-                
-            return res.strip()
-
-        # Resolve excluded names for attributes
-        excluded_device_names = []
-        for d_id in excluded_dev_ids:
-            device_entry = dev_reg.async_get(d_id)
-            if device_entry:
-                excluded_device_names.append(device_entry.name_by_user or device_entry.name)
-            else:
-                excluded_device_names.append(f"Unknown Device ({d_id})")
+        if cycle is not None:
+            cycle.written = True
 
+        self._last_fingerprint = fingerprint
+        self._last_write = now
+        self.async_write_ha_state()
+
+    @callback
+    def _async_render(self, report: UnavailableReport) -> None:
+        """Build the state attributes from a report."""
+        count = report.count
         self._attr_native_value = count
-        self._attr_extra_state_attributes = {
-            "count": count,
-            # "report_summary": format_markdown(...), # REMOVED
-            "devices_report": format_devices_only(unavailable_devices, unknown_devices),
-            "entities_report": format_entities_only(standalone_unavailable, standalone_unknown),
-            "unavailable_devices": [{"device_id": k, "name": v["name"], "duration": v["duration"]} for k, v in unavailable_devices.items()],
-            "unknown_devices": [{"device_id": k, "name": v["name"], "duration": v["duration"]} for k, v in unknown_devices.items()],
-            "unavailable_device_ids": list(unavailable_devices.keys()),
-            "unknown_device_ids": list(unknown_devices.keys()),
-            "unavailable_entities": standalone_unavailable,
-            "unknown_entities": standalone_unknown,
-            "unavailable_entity_ids": [ent["entity"] for ent in standalone_unavailable], 
-            "unknown_entity_ids": [ent["entity"] for ent in standalone_unknown],
-            "excluded_devices": excluded_device_names,
-            "excluded_entities": excluded_ent_ids,
-        }
 
+        cycle = self.coordinator.stats.last
         try:
-            self._truncate_attributes()
+            with cycle.measure("render") if cycle else nullcontext():
+                self._renderer.update(
+                    report.unavailable_devices,
+                    report.unknown_devices,
+                    report.unavailable_entities,
+                    report.unknown_entities,
+                    dt_util.utcnow().timestamp(),
+                    self.duration_granularity,
+                    report.unavailable_integrations,
+                    report.integration_members,
+                )
+            with cycle.measure("paginate") if cycle else nullcontext():
+                self._attr_extra_state_attributes = self._plan_attributes(report)
         except Exception as e:
-            _LOGGER.error(f"Failed to truncate/paginate attributes: {e}", exc_info=True)
-            self._attr_extra_state_attributes["error"] = f"Truncation failed: {str(e)}"
+            _LOGGER.error(f"Failed to plan attributes: {e}", exc_info=True)
+            self._attr_extra_state_attributes = {
+                "count": count,
+                "error": f"Attribute planning failed: {str(e)}",
+            }
 
         if count == 0:
             self._attr_icon = "mdi:check-circle"
         else:
             self._attr_icon = "mdi:alert-circle"
-            
-        _LOGGER.info(f"Report updated: {count} devices/entities unavailable")
-
-    def _paginate_attribute(self, attr_name: str, content: str, page_prefix: str, count_attr: str):
-        """Split content into pages and store in attributes."""
-        MAX_TEXT_BYTES = 2048
-        
-        # Remove original massive attribute
-        self._attr_extra_state_attributes.pop(attr_name, None)
-        
-        pages = []
-        if content:
-            lines = content.split('\n')
-            current_page = ""
-            
-            for line in lines:
-                line_full = line + "\n"
-                
-                # Check if adding this line exceeds the limit
-                if len((current_page + line_full).encode('utf-8')) > MAX_TEXT_BYTES:
-                    if current_page:
-                        pages.append("\n" + current_page)
-                        current_page = line_full
-                    else:
-                        # Single line exceeds limit, add it anyway
-                        pages.append("\n" + line_full)
-                        current_page = ""
-                else:
-                    current_page += line_full
-            
-            if current_page:
-                pages.append("\n" + current_page)
-
-        # Store pages and count
-        self._attr_extra_state_attributes[count_attr] = len(pages)
-        for idx, page_content in enumerate(pages):
-            self._attr_extra_state_attributes[f"{page_prefix}_{idx+1}"] = page_content
-            
-        return len(pages)
-
-    def _truncate_attributes(self):
-        """Split attributes to avoid database overflow."""
-        # 1. Truncate Raw Lists
-        limit = 20
-        devs = self._attr_extra_state_attributes.get("unavailable_devices", [])
-        ents = self._attr_extra_state_attributes.get("unavailable_entities", [])
-        ent_ids = self._attr_extra_state_attributes.get("unavailable_entity_ids", [])
-        
-        if len(devs) > limit:
-            self._attr_extra_state_attributes["unavailable_devices"] = devs[:limit]
-            self._attr_extra_state_attributes["unavailable_devices_truncated"] = len(devs) - limit
-        
-        # Truncate Unknown Devices
-        uk_devs = self._attr_extra_state_attributes.get("unknown_devices", [])
-        if len(uk_devs) > limit:
-            self._attr_extra_state_attributes["unknown_devices"] = uk_devs[:limit]
-            self._attr_extra_state_attributes["unknown_devices_truncated"] = len(uk_devs) - limit
-            
-        if len(ents) > limit:
-            self._attr_extra_state_attributes["unavailable_entities"] = ents[:limit] 
-            self._attr_extra_state_attributes["unavailable_entities_truncated"] = len(ents) - limit
-            
-        # Truncate Unknown Entities
-        uk_ents = self._attr_extra_state_attributes.get("unknown_entities", [])
-        if len(uk_ents) > limit:
-            self._attr_extra_state_attributes["unknown_entities"] = uk_ents[:limit] 
-            self._attr_extra_state_attributes["unknown_entities_truncated"] = len(uk_ents) - limit
-
-        # Truncate excluded lists (they can be huge)
-        ex_devs = self._attr_extra_state_attributes.get("excluded_devices", [])
-        if len(ex_devs) > limit:
-            self._attr_extra_state_attributes["excluded_devices"] = ex_devs[:limit]
-            self._attr_extra_state_attributes["excluded_devices_truncated"] = len(ex_devs) - limit
-
-        ex_ents = self._attr_extra_state_attributes.get("excluded_entities", [])
-        if len(ex_ents) > limit:
-            self._attr_extra_state_attributes["excluded_entities"] = ex_ents[:limit]
-            self._attr_extra_state_attributes["excluded_entities_truncated"] = len(ex_ents) - limit
-
-        # Truncate flat list too (generous limit)
-        if len(ent_ids) > 100:
-            self._attr_extra_state_attributes["unavailable_entity_ids"] = ent_ids[:100]
-            
-        uk_ent_ids = self._attr_extra_state_attributes.get("unknown_entity_ids", [])
-        if len(uk_ent_ids) > 100:
-            self._attr_extra_state_attributes["unknown_entity_ids"] = uk_ent_ids[:100]
-
-        # 2. Paginate Markdown Reports
-        # report_summary = self._attr_extra_state_attributes.get("report_summary", "")
-        devices_report = self._attr_extra_state_attributes.get("devices_report", "")
-        entities_report = self._attr_extra_state_attributes.get("entities_report", "")
-
-        # pgs_total = self._paginate_attribute("report_summary", report_summary, "report_page", "report_pages")
-        pgs_dev = self._paginate_attribute("devices_report", devices_report, "devices_page", "devices_pages")
-        pgs_ent = self._paginate_attribute("entities_report", entities_report, "entities_page", "entities_pages")
-
-        _LOGGER.debug(f"Reports split: Devs={pgs_dev}, Ents={pgs_ent} pages")
+
+    def _plan_attributes(self, report: UnavailableReport) -> dict[str, Any]:
+        """Fill the report attributes by group priority within the byte budget."""
+        planner = AttributePlanner(self.attribute_budget, PLANNED_ATTRIBUTES, PAGE_COUNT_ATTRIBUTES)
+        planner.add("count", report.count)
+
+        # Items of a down integration are listed by its row only
+        members = report.integration_members
+        unavailable_devices = shown_devices(report.unavailable_devices, members)
+        unknown_devices = shown_devices(report.unknown_devices, members)
+        unavailable_entities = shown_entities(report.unavailable_entities, members)
+        unknown_entities = shown_entities(report.unknown_entities, members)
+
+        for group in self.attribute_priority:
+            if group == ATTRIBUTE_GROUP_IDS:
+                for key, devices in (
+                    ("unavailable_device_ids", unavailable_devices),
+                    ("unknown_device_ids", unknown_devices),
+                ):
+                    planner.add_list(key, devices, len(devices))
+                for key, entities in (
+                    ("unavailable_entity_ids", unavailable_entities),
+                    ("unknown_entity_ids", unknown_entities),
+                ):
+                    planner.add_list(key, (ent.entity for ent in entities), len(entities))
+            elif group == ATTRIBUTE_GROUP_PAGES:
+                planner.add_pages((
+                    ("devices_page", "devices_pages", iter_pages(self._renderer.devices_lines())),
+                    ("entities_page", "entities_pages", iter_pages(self._renderer.entities_lines())),
+                ))
+            elif group == ATTRIBUTE_GROUP_DEVICES:
+                planner.add_list(
+                    "unavailable_integrations",
+                    (
+                        {"config_entry_id": k, **v._asdict(), "since": isoformat(v.since)}
+                        for k, v in report.unavailable_integrations.items()
+                    ),
+                    len(report.unavailable_integrations),
+                )
+                for key, devices in (
+                    ("unavailable_devices", unavailable_devices),
+                    ("unknown_devices", unknown_devices),
+                ):
+                    planner.add_list(
+                        key,
+                        ({"device_id": k, "name": v.name, "since": isoformat(v.since)} for k, v in devices.items()),
+                        len(devices),
+                    )
+            elif group == ATTRIBUTE_GROUP_ENTITIES:
+                for key, entities in (
+                    ("unavailable_entities", unavailable_entities),
+                    ("unknown_entities", unknown_entities),
+                ):
+                    planner.add_list(
+                        key,
+                        ({**ent._asdict(), "since": isoformat(ent.since)} for ent in entities),
+                        len(entities),
+                    )
+            elif group == ATTRIBUTE_GROUP_EXCLUDED:
+                planner.add_list("excluded_devices", report.excluded_devices, len(report.excluded_devices))
+                planner.add_list("excluded_entities", report.excluded_entities, len(report.excluded_entities))
+
+        _LOGGER.debug(f"Attributes planned with {planner.remaining} bytes to spare, dropped: {planner.dropped}")
+        return planner.finish()
+
+
+class UnavailableCountSensor(CoordinatorEntity[UnavailableDevicesCoordinator], SensorEntity):
+    """A single count from the report, cheap to keep in history.
+
+    Named after the report device, so every view gets its own names.
+    """
+
+    _attr_has_entity_name = True
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(
+        self,
+        coordinator: UnavailableDevicesCoordinator,
+        key: str,
+        name: str,
+        icon: str,
+        value_fn: Callable[[UnavailableReport], int],
+    ) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._value_fn = value_fn
+        self._attr_name = name
+        self._attr_icon = icon
+        self._attr_device_info = _device_info(coordinator)
+        if coordinator.entry:
+            self._attr_unique_id = f"{coordinator.entry.entry_id}_{key}"
+        else:
+            self._attr_unique_id = f"unavailable_devices_report_sensor_{key}"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the count from the latest report."""
+        if self.coordinator.data is None:
+            return None
+        return self._value_fn(self.coordinator.data)
+
+class ScanDurationSensor(CoordinatorEntity[UnavailableDevicesCoordinator], SensorEntity):
+    """Diagnostic sensor with the timings of the latest report cycle.
+
+    A report cycle runs every scan interval, so the sensor is disabled by
+    default, keeps its attributes out of the recorder and writes its state
+    at most once per SCAN_DURATION_WRITE_INTERVAL.
+    """
+
+    _attr_has_entity_name = True
+    _attr_name = "Scan Duration"
+    _attr_icon = "mdi:timer-outline"
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_device_class = SensorDeviceClass.DURATION
+    _attr_native_unit_of_measurement = UnitOfTime.MILLISECONDS
+    _attr_state_class = SensorStateClass.MEASUREMENT
+    _attr_suggested_display_precision = 0
+    _attr_entity_registry_enabled_default = False
+    _unrecorded_attributes = frozenset({"phases_ms", "counts", "payload_bytes", "written", "summary"})
+
+    def __init__(self, coordinator: UnavailableDevicesCoordinator) -> None:
+        """Initialize the sensor."""
+        super().__init__(coordinator)
+        self._last_write: float | None = None
+        self._attr_device_info = _device_info(coordinator)
+        if coordinator.entry:
+            self._attr_unique_id = f"{coordinator.entry.entry_id}_scan_duration"
+        else:
+            self._attr_unique_id = "unavailable_devices_report_sensor_scan_duration"
+
+    @property
+    def native_value(self) -> int | None:
+        """Return the total time of the latest cycle."""
+        cycle = self.coordinator.stats.last
+        return round(cycle.total_ms) if cycle else None
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        """Write the state of the first cycle, then once per write interval."""
+        now = time.monotonic()
+        if self._last_write is not None and now - self._last_write < SCAN_DURATION_WRITE_INTERVAL:
+            return
+        self._last_write = now
+        self.async_write_ha_state()
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return per-phase timings, counts and the rolling summary."""
+        cycle = self.coordinator.stats.last
+        if cycle is None:
+            return None
+        data = cycle.as_dict()
+        return {
+            "phases_ms": data["phases_ms"],
+            "counts": data["counts"],
+            "payload_bytes": data["payload_bytes"],
+            "written": data["written"],
+            "summary": self.coordinator.stats.summary(),
+        }
@@ -0,0 +1,434 @@
+"""Services for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Iterable
+from dataclasses import dataclass
+from datetime import timedelta
+import logging
+import time
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.const import STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import (
+    HomeAssistant,
+    ServiceCall,
+    ServiceResponse,
+    SupportsResponse,
+    callback,
+)
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import (
+    config_validation as cv,
+    device_registry as dr,
+    entity_registry as er,
+)
+
+from .const import CONF_DURATION_GRANULARITY, DOMAIN
+from .coordinator import UnavailableDevicesCoordinator
+from .export import EXPORT_FORMAT_JSONL, EXPORT_FORMATS
+from .history import HISTORY_SORT_KEYS
+from .models import ITEM_DEVICE, ITEM_ENTITY, ITEM_INTEGRATION, ReportItem
+from .report import (
+    GRANULARITY_MINUTE,
+    format_duration,
+    isoformat,
+    markdown_row,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+SERVICE_REMOVE_ITEMS = "remove_items"
+SERVICE_QUERY = "query"
+SERVICE_HISTORY = "history"
+SERVICE_EXPORT = "export"
+
+ATTR_ENTITY_ID = "entity_id"
+ATTR_DEVICE_ID = "device_id"
+ATTR_FROM_REPORT = "from_report"
+ATTR_STATE = "state"
+ATTR_MIN_AGE = "min_age"
+ATTR_INTEGRATION = "integration"
+ATTR_DRY_RUN = "dry_run"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_TYPE = "type"
+ATTR_SEARCH = "search"
+ATTR_SORT_BY = "sort_by"
+ATTR_DESCENDING = "descending"
+ATTR_OFFSET = "offset"
+ATTR_LIMIT = "limit"
+ATTR_MARKDOWN = "markdown"
+ATTR_FORMAT = "format"
+ATTR_FORCE = "force"
+
+SORT_KEYS = ["since", "name", "id"]
+DEFAULT_HISTORY_LIMIT = 10
+
+# Registry removals per batch before yielding to the event loop
+REMOVE_BATCH_SIZE = 100
+
+REMOVE_ITEMS_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTITY_ID, default=[]): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_DEVICE_ID, default=[]): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_FROM_REPORT, default=False): cv.boolean,
+        vol.Optional(ATTR_STATE): vol.All(
+            cv.ensure_list, [vol.In([STATE_UNAVAILABLE, STATE_UNKNOWN])]
+        ),
+        vol.Optional(ATTR_MIN_AGE): cv.positive_time_period,
+        vol.Optional(ATTR_INTEGRATION): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_DRY_RUN, default=False): cv.boolean,
+    }
+)
+
+QUERY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_TYPE): vol.All(
+            cv.ensure_list, [vol.In([ITEM_INTEGRATION, ITEM_DEVICE, ITEM_ENTITY])]
+        ),
+        vol.Optional(ATTR_STATE): vol.All(
+            cv.ensure_list, [vol.In([STATE_UNAVAILABLE, STATE_UNKNOWN])]
+        ),
+        vol.Optional(ATTR_MIN_AGE): cv.positive_time_period,
+        vol.Optional(ATTR_SEARCH): cv.string,
+        vol.Optional(ATTR_SORT_BY, default="since"): vol.In(SORT_KEYS),
+        vol.Optional(ATTR_DESCENDING, default=False): cv.boolean,
+        vol.Optional(ATTR_OFFSET, default=0): cv.positive_int,
+        vol.Optional(ATTR_LIMIT): cv.positive_int,
+        vol.Optional(ATTR_MARKDOWN, default=False): cv.boolean,
+    }
+)
+
+HISTORY_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_SORT_BY, default="outages"): vol.In(HISTORY_SORT_KEYS),
+        vol.Optional(ATTR_LIMIT, default=DEFAULT_HISTORY_LIMIT): cv.positive_int,
+    }
+)
+
+EXPORT_SCHEMA = vol.Schema(
+    {
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): cv.string,
+        vol.Optional(ATTR_FORMAT, default=[EXPORT_FORMAT_JSONL]): vol.All(
+            cv.ensure_list, [vol.In(EXPORT_FORMATS)]
+        ),
+        vol.Optional(ATTR_FORCE, default=False): cv.boolean,
+    }
+)
+
+
+@dataclass(slots=True)
+class _Candidate:
+    """An entity or device considered for removal."""
+
+    item_id: str
+    state: str | None
+    since: float | None
+    integrations: frozenset[str]
+
+
+@callback
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration services once."""
+    if hass.services.has_service(DOMAIN, SERVICE_REMOVE_ITEMS):
+        return
+
+    async def async_query(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to query the report."""
+        return _async_query(hass, call.data)
+
+    async def async_history(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to return the top offenders."""
+        coordinator = _query_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        history = coordinator.history
+        return {
+            "tracked": len(history.items),
+            "items": history.top_offenders(call.data[ATTR_SORT_BY], call.data[ATTR_LIMIT]),
+        }
+
+    async def async_export(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to export the full report to files."""
+        coordinator = _query_coordinator(hass, call.data.get(ATTR_CONFIG_ENTRY_ID))
+        if coordinator.data is None:
+            raise HomeAssistantError("The report has not been computed yet")
+        try:
+            files = await coordinator.exporter.async_export(
+                coordinator.data, call.data[ATTR_FORMAT], coordinator.options, call.data[ATTR_FORCE]
+            )
+        except OSError as err:
+            raise HomeAssistantError(f"Failed to export the report: {err}") from err
+        return {"files": files}
+
+    async def async_remove_items(call: ServiceCall) -> ServiceResponse:
+        """Handle the service call to remove items."""
+        return await _async_remove_items(hass, call.data)
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_REMOVE_ITEMS,
+        async_remove_items,
+        schema=REMOVE_ITEMS_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_QUERY,
+        async_query,
+        schema=QUERY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_HISTORY,
+        async_history,
+        schema=HISTORY_SCHEMA,
+        supports_response=SupportsResponse.ONLY,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_EXPORT,
+        async_export,
+        schema=EXPORT_SCHEMA,
+        supports_response=SupportsResponse.OPTIONAL,
+    )
+
+
+@callback
+def _async_query(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Filter, sort and page the last computed report without rescanning."""
+    coordinator = _query_coordinator(hass, data.get(ATTR_CONFIG_ENTRY_ID))
+    report = coordinator.data
+    if report is None:
+        raise HomeAssistantError("The report has not been computed yet")
+
+    types = data.get(ATTR_TYPE)
+    states = data.get(ATTR_STATE)
+    min_age: timedelta | None = data.get(ATTR_MIN_AGE)
+    search = data.get(ATTR_SEARCH, "").casefold()
+    now = time.time()
+    cutoff = now - min_age.total_seconds() if min_age else None
+
+    items = [
+        item
+        for item in report.items().values()
+        if (not types or item.type in types)
+        and (not states or item.state in states)
+        and (cutoff is None or item.since <= cutoff)
+        and (
+            not search
+            or search in item.id.casefold()
+            or search in (item.name or "").casefold()
+        )
+    ]
+    sort_by = data[ATTR_SORT_BY]
+
+    def sort_key(item: ReportItem) -> tuple:
+        if sort_by == "since":
+            return (item.since, item.id)
+        return ((getattr(item, sort_by) or "").casefold(), item.id)
+
+    items.sort(key=sort_key, reverse=data[ATTR_DESCENDING])
+
+    offset = data[ATTR_OFFSET]
+    limit = data.get(ATTR_LIMIT)
+    page = items[offset:offset + limit if limit is not None else None]
+
+    granularity = coordinator.options.get(CONF_DURATION_GRANULARITY, GRANULARITY_MINUTE)
+    response: dict[str, Any] = {
+        "computed_at": isoformat(report.computed_at),
+        "total": len(items),
+        "offset": offset,
+        "count": len(page),
+        "items": [
+            {**item.as_dict(), "since": isoformat(item.since), "duration": int(now - item.since)}
+            for item in page
+        ],
+    }
+    if data[ATTR_MARKDOWN]:
+        response["markdown"] = "\n".join(
+            markdown_row(item, format_duration(now - item.since, granularity))
+            for item in page
+        )
+    return response
+
+
+async def _async_remove_items(hass: HomeAssistant, data: dict[str, Any]) -> dict[str, Any]:
+    """Select entities and devices, then remove them in bounded batches.
+
+    Explicit IDs and, with from_report, everything in the current report are
+    candidates. The state, minimum age and integration filters apply to all of
+    them; a candidate whose state or age cannot be determined never passes
+    those filters.
+    """
+    ent_reg = er.async_get(hass)
+    dev_reg = dr.async_get(hass)
+    coordinators = _coordinators(hass)
+
+    entities: dict[str, _Candidate] = {}
+    devices: dict[str, _Candidate] = {}
+
+    for entity_id in data[ATTR_ENTITY_ID]:
+        entities[entity_id] = _entity_candidate(hass, ent_reg, entity_id)
+    for device_id in data[ATTR_DEVICE_ID]:
+        devices[device_id] = _device_candidate(hass, dev_reg, coordinators, device_id)
+
+    if data[ATTR_FROM_REPORT]:
+        for coordinator in coordinators:
+            if coordinator.data is None:
+                continue
+            for item in coordinator.data.items().values():
+                if item.type == ITEM_INTEGRATION:
+                    # Never remove a whole integration's devices in one go
+                    continue
+                if item.type == ITEM_DEVICE:
+                    devices[item.id] = _Candidate(
+                        item.id,
+                        item.state,
+                        item.since,
+                        _device_integrations(hass, dev_reg, item.id),
+                    )
+                else:
+                    entry = ent_reg.async_get(item.id)
+                    entities[item.id] = _Candidate(
+                        item.id,
+                        item.state,
+                        item.since,
+                        frozenset((entry.platform,)) if entry else frozenset(),
+                    )
+
+    states = data.get(ATTR_STATE)
+    min_age: timedelta | None = data.get(ATTR_MIN_AGE)
+    integrations = data.get(ATTR_INTEGRATION)
+    cutoff = time.time() - min_age.total_seconds() if min_age else None
+
+    def selected(candidates: Iterable[_Candidate]) -> list[str]:
+        return sorted(
+            candidate.item_id
+            for candidate in candidates
+            if (not states or candidate.state in states)
+            and (
+                cutoff is None
+                or (candidate.since is not None and candidate.since <= cutoff)
+            )
+            and (not integrations or not candidate.integrations.isdisjoint(integrations))
+        )
+
+    # Items outside the registries (e.g. YAML entities) cannot be removed
+    entity_ids: list[str] = []
+    device_ids: list[str] = []
+    skipped: list[str] = []
+    for entity_id in selected(entities.values()):
+        (entity_ids if ent_reg.async_get(entity_id) else skipped).append(entity_id)
+    for device_id in selected(devices.values()):
+        (device_ids if dev_reg.async_get(device_id) else skipped).append(device_id)
+
+    dry_run = data[ATTR_DRY_RUN]
+    if not dry_run:
+        removed_entities = await _async_remove_batched(
+            entity_ids, ent_reg.async_get, ent_reg.async_remove
+        )
+        removed_devices = await _async_remove_batched(
+            device_ids, dev_reg.async_get, dev_reg.async_remove_device
+        )
+        _LOGGER.info(
+            "Removed %d entities and %d devices", removed_entities, removed_devices
+        )
+    else:
+        _LOGGER.info(
+            "Dry run: would remove %d entities and %d devices",
+            len(entity_ids),
+            len(device_ids),
+        )
+
+    return {
+        "dry_run": dry_run,
+        "entities": entity_ids,
+        "devices": device_ids,
+        "skipped": skipped,
+    }
+
+
+async def _async_remove_batched(item_ids: list[str], get, remove) -> int:
+    """Remove items in batches, yielding to the event loop between them."""
+    removed = 0
+    for start in range(0, len(item_ids), REMOVE_BATCH_SIZE):
+        if start:
+            await asyncio.sleep(0)
+        for item_id in item_ids[start:start + REMOVE_BATCH_SIZE]:
+            # The item may have gone away while we yielded
+            if get(item_id) is None:
+                continue
+            remove(item_id)
+            removed += 1
+            _LOGGER.debug("Removed %s", item_id)
+    return removed
+
+
+def _coordinators(hass: HomeAssistant) -> list[UnavailableDevicesCoordinator]:
+    """Return the coordinators of all loaded config entries."""
+    return list(hass.data.get(DOMAIN, {}).values())
+
+
+def _query_coordinator(
+    hass: HomeAssistant, entry_id: str | None
+) -> UnavailableDevicesCoordinator:
+    """Return the coordinator of a config entry, or the first loaded one."""
+    coordinators: dict[str, UnavailableDevicesCoordinator] = hass.data.get(DOMAIN, {})
+    if entry_id is not None:
+        if entry_id not in coordinators:
+            raise HomeAssistantError(f"No loaded report with config entry ID {entry_id}")
+        return coordinators[entry_id]
+    if not coordinators:
+        raise HomeAssistantError("No report is loaded")
+    return next(iter(coordinators.values()))
+
+
+def _entity_candidate(
+    hass: HomeAssistant, ent_reg: er.EntityRegistry, entity_id: str
+) -> _Candidate:
+    """Describe an explicitly requested entity from the state machine."""
+    state = hass.states.get(entity_id)
+    entry = ent_reg.async_get(entity_id)
+    return _Candidate(
+        entity_id,
+        state.state if state else None,
+        state.last_changed.timestamp() if state else None,
+        frozenset((entry.platform,)) if entry else frozenset(),
+    )
+
+
+def _device_candidate(
+    hass: HomeAssistant,
+    dev_reg: dr.DeviceRegistry,
+    coordinators: list[UnavailableDevicesCoordinator],
+    device_id: str,
+) -> _Candidate:
+    """Describe an explicitly requested device from the reports."""
+    state = since = None
+    for coordinator in coordinators:
+        if coordinator.data is None:
+            continue
+        item = coordinator.data.items().get(f"{ITEM_DEVICE}:{device_id}")
+        if item is not None:
+            state, since = item.state, item.since
+            break
+    return _Candidate(device_id, state, since, _device_integrations(hass, dev_reg, device_id))
+
+
+def _device_integrations(
+    hass: HomeAssistant, dev_reg: dr.DeviceRegistry, device_id: str
+) -> frozenset[str]:
+    """Return the integration domains a device belongs to."""
+    device = dev_reg.async_get(device_id)
+    if device is None:
+        return frozenset()
+    domains = set()
+    for entry_id in device.config_entries:
+        entry = hass.config_entries.async_get_entry(entry_id)
+        if entry is not None:
+            domains.add(entry.domain)
+    return frozenset(domains)
@@ -0,0 +1,83 @@
+"""Scan instrumentation for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+import time
+from typing import Any
+
+# Number of scan cycles kept for the diagnostics sensor and download
+DEFAULT_STATS_CYCLES = 50
+
+
+@dataclass(slots=True)
+class ScanCycle:
+    """Timings, item counts and payload size of one report cycle."""
+
+    started: float = field(default_factory=time.time)
+    phases_ms: dict[str, float] = field(default_factory=dict)
+    counts: dict[str, int] = field(default_factory=dict)
+    payload_bytes: int | None = None
+    written: bool | None = None
+
+    @contextmanager
+    def measure(self, phase: str) -> Iterator[None]:
+        """Time the enclosed block and add it to a phase."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = (time.perf_counter() - start) * 1000
+            self.phases_ms[phase] = self.phases_ms.get(phase, 0.0) + elapsed
+
+    @property
+    def total_ms(self) -> float:
+        """Return the time spent in all phases."""
+        return sum(self.phases_ms.values())
+
+    def as_dict(self) -> dict[str, Any]:
+        """Return the cycle as JSON-ready data."""
+        data = asdict(self)
+        data["phases_ms"] = {phase: round(ms, 3) for phase, ms in self.phases_ms.items()}
+        data["total_ms"] = round(self.total_ms, 3)
+        return data
+
+
+class ScanStats:
+    """Bounded ring buffer of recent scan cycles."""
+
+    def __init__(self, maxlen: int = DEFAULT_STATS_CYCLES) -> None:
+        """Initialize the buffer."""
+        self.cycles: deque[ScanCycle] = deque(maxlen=maxlen)
+
+    def start_cycle(self) -> ScanCycle:
+        """Start recording a new cycle, evicting the oldest if full."""
+        cycle = ScanCycle()
+        self.cycles.append(cycle)
+        return cycle
+
+    @property
+    def last(self) -> ScanCycle | None:
+        """Return the most recent cycle."""
+        return self.cycles[-1] if self.cycles else None
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Return mean and max milliseconds per phase over the buffer."""
+        totals: dict[str, list[float]] = {}
+        for cycle in self.cycles:
+            for phase, ms in cycle.phases_ms.items():
+                totals.setdefault(phase, []).append(ms)
+            totals.setdefault("total", []).append(cycle.total_ms)
+        return {
+            phase: {
+                "mean_ms": round(sum(values) / len(values), 3),
+                "max_ms": round(max(values), 3),
+            }
+            for phase, values in totals.items()
+        }
+
+    def as_list(self) -> list[dict[str, Any]]:
+        """Return all cycles, oldest first."""
+        return [cycle.as_dict() for cycle in self.cycles]
@@ -0,0 +1,101 @@
+"""WebSocket API for the Unavailable Devices Report integration."""
+from __future__ import annotations
+
+from typing import Any
+
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN
+from .coordinator import UnavailableDevicesCoordinator
+from .models import ReportItem
+
+WS_TYPE_SUBSCRIBE = f"{DOMAIN}/subscribe"
+
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the websocket commands."""
+    websocket_api.async_register_command(hass, ws_subscribe)
+
+
+@websocket_api.websocket_command(
+    {
+        vol.Required("type"): WS_TYPE_SUBSCRIBE,
+        vol.Optional("config_entry_id"): str,
+    }
+)
+@callback
+def ws_subscribe(
+    hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict[str, Any]
+) -> None:
+    """Send the report as a snapshot, then only what changes.
+
+    The first event holds every item; later events list the items added and
+    updated and the keys removed since the previous event.
+    Items carry their outage start, so clients compute durations themselves.
+    """
+    coordinators: dict[str, UnavailableDevicesCoordinator] = hass.data.get(DOMAIN, {})
+    entry_id = msg.get("config_entry_id")
+    if entry_id is None and coordinators:
+        entry_id = next(iter(coordinators))
+    coordinator = coordinators.get(entry_id)
+    if coordinator is None:
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, "No report is loaded")
+        return
+
+    sent: dict[str, ReportItem] = {}
+
+    @callback
+    def async_send_snapshot() -> None:
+        report = coordinator.data
+        items = report.items() if report is not None else {}
+        sent.update(items)
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "type": "snapshot",
+                    "computed_at": report.computed_at if report is not None else None,
+                    "items": [{"key": key, **item.as_dict()} for key, item in items.items()],
+                },
+            )
+        )
+
+    @callback
+    def async_send_delta() -> None:
+        report = coordinator.data
+        if report is None:
+            return
+        items = report.items()
+        added: list[dict[str, Any]] = []
+        updated: list[dict[str, Any]] = []
+        for key, item in items.items():
+            previous = sent.get(key)
+            if previous is None:
+                added.append({"key": key, **item.as_dict()})
+            elif previous != item:
+                updated.append({"key": key, **item.as_dict()})
+        removed = [key for key in sent if key not in items]
+        if not added and not updated and not removed:
+            return
+        sent.clear()
+        sent.update(items)
+        connection.send_message(
+            websocket_api.event_message(
+                msg["id"],
+                {
+                    "type": "delta",
+                    "computed_at": report.computed_at,
+                    "added": added,
+                    "updated": updated,
+                    "removed": removed,
+                },
+            )
+        )
+
+    connection.subscriptions[msg["id"]] = coordinator.async_add_listener(async_send_delta)
+    connection.send_result(msg["id"])
+    async_send_snapshot()
@@ -0,0 +1,86 @@
+"""Tests for the report coordinator."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from benchmarks.bench_report import build_install
+from custom_components.ha_unavailable_devices_report.const import (
+    CONF_COLLAPSE_THRESHOLD,
+    DATA_ENGINE,
+)
+from custom_components.ha_unavailable_devices_report.coordinator import (
+    UnavailableDevicesCoordinator,
+)
+from custom_components.ha_unavailable_devices_report.engine import SharedEngine, TimeBudget
+from custom_components.ha_unavailable_devices_report.models import (
+    ITEM_DEVICE,
+    ITEM_ENTITY,
+    ITEM_INTEGRATION,
+)
+from custom_components.ha_unavailable_devices_report.sensor import UnavailableDevicesSensor
+
+
+def test_repeated_shutdown_keeps_shared_engine() -> None:
+    """Shutting one view down twice leaves the engine running for the other."""
+
+    async def run() -> None:
+        hass = build_install(200, outage_ratio=0.1, stray_ratio=0.1, seed=1)
+        hass.loop = asyncio.get_running_loop()
+        hass.async_create_task = lambda target, *args, **kwargs: hass.loop.create_task(target)
+        engine = SharedEngine.async_get(hass)
+        view_a = UnavailableDevicesCoordinator(hass, engine)
+        view_b = UnavailableDevicesCoordinator(hass, engine)
+        view_a.async_start()
+        view_b.async_start()
+        await asyncio.sleep(0)
+
+        # Once from the entry unload and once from the base class unload callback
+        await view_a.async_shutdown()
+        await view_a.async_shutdown()
+        assert hass.data[DATA_ENGINE] is engine
+        assert engine.tracker.started
+
+        await view_b.async_shutdown()
+        assert DATA_ENGINE not in hass.data
+        assert not engine.tracker.started
+
+    asyncio.run(run())
+
+
+def test_collapsed_entry_keeps_its_items() -> None:
+    """A down hub is grouped in the sensor but its items stay in the report."""
+    hass = build_install(200, outage_ratio=0.1, stray_ratio=0.1, seed=2, hub_down="zha")
+    engine = SharedEngine(hass)
+    engine.index.async_start()
+    engine.tracker.async_start()
+    coordinator = UnavailableDevicesCoordinator(hass, engine)
+    report = asyncio.run(coordinator._async_build_report(TimeBudget(0)))
+    assert list(report.unavailable_integrations) == ["entry_zha"]
+    assert report.integration_members
+    assert set(report.integration_members.values()) == {"entry_zha"}
+
+    # The items, and with them the outage history, do not depend on the grouping
+    coordinator.options = {CONF_COLLAPSE_THRESHOLD: 0}
+    plain = asyncio.run(coordinator._async_build_report(TimeBudget(0)))
+    assert not plain.unavailable_integrations
+    assert report.items().keys() - plain.items().keys() == {f"{ITEM_INTEGRATION}:entry_zha"}
+    assert report.integration_members.keys() <= plain.items().keys()
+
+    coordinator.stats = SimpleNamespace(last=None)
+    sensor = UnavailableDevicesSensor(coordinator)
+    sensor._async_render(report)
+    attributes = sensor.extra_state_attributes
+    listed = {
+        f"{ITEM_DEVICE}:{device_id}"
+        for key in ("unavailable_device_ids", "unknown_device_ids")
+        for device_id in attributes.get(key, [])
+    }
+    listed.update(
+        f"{ITEM_ENTITY}:{entity_id}"
+        for key in ("unavailable_entity_ids", "unknown_entity_ids")
+        for entity_id in attributes.get(key, [])
+    )
+    assert listed
+    assert not listed & report.integration_members.keys()
+    assert attributes["count"] == plain.count
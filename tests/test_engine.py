@@ -0,0 +1,165 @@
+"""Tests for the incremental per-device counts of the tracker."""
+from __future__ import annotations
+
+import asyncio
+from dataclasses import replace
+import random
+
+from homeassistant.const import EVENT_STATE_CHANGED, STATE_UNAVAILABLE, STATE_UNKNOWN
+from homeassistant.core import State
+from homeassistant.helpers import device_registry as dr, entity_registry as er
+
+from benchmarks.bench_report import FakeEntityEntry, FakeHass, build_install
+from custom_components.ha_unavailable_devices_report.engine import (
+    SharedEngine,
+    TimeBudget,
+    UnavailabilityTracker,
+)
+
+STATES = ("on", STATE_UNAVAILABLE, STATE_UNKNOWN)
+
+
+def _counts(tracker: UnavailabilityTracker) -> dict[str, tuple[int, int, int]]:
+    """Return the device counts as comparable tuples."""
+    return {
+        device_id: (counts.eligible, counts.unavailable, counts.unknown)
+        for device_id, counts in tracker.device_counts.items()
+    }
+
+
+def _assert_matches_full_scan(hass: FakeHass, tracker: UnavailabilityTracker) -> None:
+    """Check the live counts and sets against a scan from scratch."""
+    fresh = UnavailabilityTracker(hass, tracker.index)
+    fresh.async_full_scan()
+    assert _counts(tracker) == _counts(fresh)
+    assert tracker.unavailable.keys() == fresh.unavailable.keys()
+    assert tracker.unknown.keys() == fresh.unknown.keys()
+
+
+class _Events:
+    """Random state and registry changes applied to a fake install."""
+
+    def __init__(self, hass: FakeHass, seed: int) -> None:
+        self.hass = hass
+        self.rng = random.Random(seed)
+        self.ent_reg = hass.data[er.DATA_REGISTRY]
+        self.device_ids = list(hass.data[dr.DATA_REGISTRY].devices)
+        self.created = 0
+
+    def set_state(self, entity_id: str, value: str | None) -> None:
+        old = self.hass.states.get(entity_id)
+        new = State(entity_id, value) if value is not None else None
+        if new is None:
+            self.hass.states._states.pop(entity_id, None)
+        else:
+            self.hass.states.set(new)
+        self.hass.bus.fire(
+            EVENT_STATE_CHANGED, {"entity_id": entity_id, "old_state": old, "new_state": new}
+        )
+
+    def update_entry(self, entity_id: str, **changes) -> None:
+        # Registry entries are replaced, never changed in place
+        self.ent_reg.entities[entity_id] = replace(self.ent_reg.entities[entity_id], **changes)
+        self.hass.bus.fire(
+            er.EVENT_ENTITY_REGISTRY_UPDATED,
+            {"action": "update", "entity_id": entity_id, "changes": changes},
+        )
+
+    def step(self) -> None:
+        """Apply one random change."""
+        rng = self.rng
+        entity_id = rng.choice(list(self.ent_reg.entities))
+        entry = self.ent_reg.entities[entity_id]
+        action = rng.choice(
+            ("state", "state", "state", "move", "disable", "category", "remove", "create", "rename")
+        )
+        if action == "state":
+            self.set_state(entity_id, rng.choice(STATES))
+        elif action == "move":
+            self.update_entry(entity_id, device_id=rng.choice([None, *self.device_ids]))
+        elif action == "disable":
+            self.update_entry(entity_id, disabled_by=None if entry.disabled_by else "user")
+        elif action == "category":
+            self.update_entry(
+                entity_id, entity_category=None if entry.entity_category else "diagnostic"
+            )
+        elif action == "remove":
+            del self.ent_reg.entities[entity_id]
+            self.hass.bus.fire(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, {"action": "remove", "entity_id": entity_id}
+            )
+            self.set_state(entity_id, None)
+        elif action == "create":
+            self.created += 1
+            new_id = f"sensor.created_{self.created}"
+            self.ent_reg.entities[new_id] = FakeEntityEntry(
+                entity_id=new_id, platform="zha", device_id=rng.choice(self.device_ids)
+            )
+            self.hass.bus.fire(
+                er.EVENT_ENTITY_REGISTRY_UPDATED, {"action": "create", "entity_id": new_id}
+            )
+            self.set_state(new_id, rng.choice(STATES))
+        else:
+            self.created += 1
+            new_id = f"sensor.renamed_{self.created}"
+            state = self.hass.states.get(entity_id)
+            self.ent_reg.entities[new_id] = replace(entry, entity_id=new_id)
+            del self.ent_reg.entities[entity_id]
+            self.hass.bus.fire(
+                er.EVENT_ENTITY_REGISTRY_UPDATED,
+                {"action": "update", "entity_id": new_id, "old_entity_id": entity_id},
+            )
+            # The state follows the entity to its new ID
+            self.set_state(entity_id, None)
+            self.set_state(new_id, state.state if state else rng.choice(STATES))
+
+
+def _started_engine(seed: int) -> tuple[FakeHass, SharedEngine]:
+    """Return a small install with the index and tracker following it."""
+    hass = build_install(300, outage_ratio=0.3, stray_ratio=0.2, seed=seed)
+    engine = SharedEngine(hass)
+    engine.index.async_start()
+    engine.tracker.async_start()
+    return hass, engine
+
+
+def test_counts_follow_events() -> None:
+    """State and registry events keep the counts equal to a full scan."""
+    hass, engine = _started_engine(1)
+    _assert_matches_full_scan(hass, engine.tracker)
+    events = _Events(hass, 2)
+    for _ in range(1500):
+        events.step()
+        _assert_matches_full_scan(hass, engine.tracker)
+
+
+def test_full_scan_reports_no_change_after_events() -> None:
+    """A consistency scan after many events finds nothing missed."""
+    hass, engine = _started_engine(3)
+    events = _Events(hass, 4)
+    for _ in range(500):
+        events.step()
+    assert engine.tracker.async_full_scan() is False
+
+
+def test_cooperative_scan_reconciles_events() -> None:
+    """Events applied while a cooperative scan yields are not lost."""
+    hass, engine = _started_engine(5)
+    events = _Events(hass, 6)
+
+    class _EveryCheck(TimeBudget):
+        """A budget that yields at every check."""
+
+        async def async_yield(self) -> None:
+            await asyncio.sleep(0)
+
+    async def run() -> None:
+        scan = asyncio.create_task(engine.tracker.async_full_scan_cooperative(_EveryCheck(1)))
+        while not scan.done():
+            events.step()
+            await asyncio.sleep(0)
+        await scan
+
+    for _ in range(20):
+        asyncio.run(run())
+        _assert_matches_full_scan(hass, engine.tracker)
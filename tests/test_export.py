@@ -0,0 +1,29 @@
+"""Tests for the report export."""
+from __future__ import annotations
+
+from benchmarks.bench_report import FakeHass
+from custom_components.ha_unavailable_devices_report.const import DEFAULT_NAME
+from custom_components.ha_unavailable_devices_report.coordinator import (
+    UnavailableDevicesCoordinator,
+)
+from custom_components.ha_unavailable_devices_report.engine import SharedEngine
+from custom_components.ha_unavailable_devices_report.export import EXPORT_FORMAT_JSONL
+
+
+def test_views_with_the_same_title_export_to_different_files() -> None:
+    """Export files are keyed by config entry, not by the report's title."""
+    hass = FakeHass()
+    engine = SharedEngine(hass)
+
+    class _Entry:
+        def __init__(self, entry_id: str) -> None:
+            self.entry_id = entry_id
+            self.title = DEFAULT_NAME
+            self.options = {}
+
+    paths = {
+        UnavailableDevicesCoordinator(hass, engine, config_entry=entry).exporter.path(EXPORT_FORMAT_JSONL)
+        for entry in (_Entry("entry_a"), _Entry("entry_b"))
+    }
+    paths.add(UnavailableDevicesCoordinator(hass, engine).exporter.path(EXPORT_FORMAT_JSONL))
+    assert len(paths) == 3
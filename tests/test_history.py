@@ -0,0 +1,71 @@
+"""Tests for the outage history statistics."""
+from __future__ import annotations
+
+import asyncio
+from types import SimpleNamespace
+
+from custom_components.ha_unavailable_devices_report.history import ItemHistory, OutageHistory
+
+
+def test_mtbf_needs_two_failures() -> None:
+    """A single outage, open or closed, has no time between failures."""
+    item = ItemHistory("Lamp")
+    item.start(1000.0)
+    assert item.mtbf() is None
+    item.end(1100.0)
+    assert item.mtbf() is None
+
+
+def test_mtbf_counts_time_between_failures() -> None:
+    """Only the uptime between the first and the latest failure counts."""
+    item = ItemHistory("Lamp")
+    item.start(1000.0)
+    item.end(1100.0)
+    item.start(2100.0)
+    assert item.mtbf() == 1000.0
+    item.end(2200.0)
+    item.start(4200.0)
+    assert item.mtbf() == 1500.0
+    # Uptime after the latest failure does not stretch the mean
+    item.end(4300.0)
+    assert item.mtbf() == 1500.0
+
+
+def test_top_offenders_sorts_missing_mtbf_last() -> None:
+    """Items that failed once are ranked after items with an mtbf."""
+    history = OutageHistory(SimpleNamespace(config=SimpleNamespace(config_dir="")), "test")
+    once = history.items["device:once"] = ItemHistory("Once")
+    once.start(0.0)
+    flaky = history.items["device:flaky"] = ItemHistory("Flaky")
+    for start in (0.0, 100.0, 200.0):
+        flaky.start(start)
+        flaky.end(start + 10.0)
+    steady = history.items["device:steady"] = ItemHistory("Steady")
+    for start in (0.0, 5000.0):
+        steady.start(start)
+        steady.end(start + 10.0)
+
+    rows = history.top_offenders("mtbf", now=6000.0)
+    assert [row["key"] for row in rows] == ["device:flaky", "device:steady", "device:once"]
+    assert rows[-1]["mtbf"] is None
+
+
+def test_remove_entry_deletes_history(tmp_path) -> None:
+    """Removing a config entry deletes its stored history."""
+    from homeassistant.core import HomeAssistant
+    from custom_components.ha_unavailable_devices_report import async_remove_entry
+
+    async def run() -> None:
+        hass = HomeAssistant(str(tmp_path))
+        history = OutageHistory(hass, "entry_1")
+        history.items["device:a"] = ItemHistory("A")
+        history.items["device:a"].start(0.0)
+        await history.async_save()
+        path = tmp_path / ".storage" / "unavailable_devices_report.history.entry_1"
+        assert path.exists()
+        await async_remove_entry(hass, SimpleNamespace(entry_id="entry_1"))
+        await hass.async_block_till_done()
+        assert not path.exists()
+        await hass.async_stop(force=True)
+
+    asyncio.run(run())
@@ -0,0 +1,45 @@
+"""Tests for the report paging and attribute helpers."""
+from __future__ import annotations
+
+import pytest
+
+from custom_components.ha_unavailable_devices_report.report import (
+    MAX_PAGE_BYTES,
+    iter_pages,
+    render_page,
+)
+
+
+def _assert_pages_fit(lines: list[str]) -> list[list[str]]:
+    """Page the lines and check every rendered page and that nothing was lost."""
+    pages = list(iter_pages(lines))
+    for page in pages:
+        assert len(render_page(page).encode("utf-8")) <= MAX_PAGE_BYTES
+    assert "".join("".join(page) for page in pages) == "".join(lines)
+    return pages
+
+
+@pytest.mark.parametrize("length", [MAX_PAGE_BYTES - 3, MAX_PAGE_BYTES - 2, MAX_PAGE_BYTES - 1, MAX_PAGE_BYTES])
+def test_near_limit_line(length: int) -> None:
+    """A line close to the page size still renders within it."""
+    _assert_pages_fit(["x" * length])
+
+
+def test_page_filled_to_limit() -> None:
+    """Lines that exactly fill a page leave room for the leading newline."""
+    # 1 leading newline + 2047 bytes of lines with their newlines fills a page
+    lines = ["a" * 99] * 20 + ["b" * 46]
+    pages = _assert_pages_fit(lines)
+    assert len(render_page(pages[0]).encode("utf-8")) == MAX_PAGE_BYTES
+
+
+@pytest.mark.parametrize("char", ["ä", "📱", "中"])
+def test_multibyte_lines(char: str) -> None:
+    """Long and near-limit multibyte lines are split on character boundaries."""
+    _assert_pages_fit([char * 1000, char * (MAX_PAGE_BYTES // len(char.encode("utf-8"))), "- x"])
+
+
+def test_many_short_lines() -> None:
+    """Many small rows spread over several pages, none oversized."""
+    pages = _assert_pages_fit([f"- [Device {i} 📱](/config/devices/device/{i}) _(5m)_" for i in range(500)])
+    assert len(pages) > 1
@@ -0,0 +1,109 @@
+"""Tests for the report sensor attributes."""
+from __future__ import annotations
+
+import json
+import time
+from types import SimpleNamespace
+
+from custom_components.ha_unavailable_devices_report.const import (
+    CONF_ATTRIBUTE_PRIORITY,
+    DEFAULT_ATTRIBUTE_BUDGET,
+)
+from custom_components.ha_unavailable_devices_report.coordinator import UnavailableReport
+from custom_components.ha_unavailable_devices_report.models import DeviceRecord, EntityRecord
+from custom_components.ha_unavailable_devices_report import sensor as sensor_module
+from custom_components.ha_unavailable_devices_report.sensor import (
+    ScanDurationSensor,
+    UnavailableDevicesSensor,
+)
+
+
+def _large_outage() -> UnavailableReport:
+    """Return a report of 400 failed devices and 300 unknown YAML entities."""
+    since = time.time() - 3600
+    return UnavailableReport(
+        unavailable_devices={
+            f"{n:032x}": DeviceRecord(f"Device {n}", since) for n in range(400)
+        },
+        unknown_devices={},
+        unavailable_entities=[],
+        unknown_entities=[
+            EntityRecord(f"sensor.yaml_{n}", since, False) for n in range(300)
+        ],
+        excluded_devices=[],
+        excluded_entities=[],
+    )
+
+
+def _render(options: dict) -> dict:
+    """Render a large outage and return the sensor attributes."""
+    coordinator = SimpleNamespace(entry=None, options=options, stats=SimpleNamespace(last=None))
+    sensor = UnavailableDevicesSensor(coordinator)
+    sensor._async_render(_large_outage())
+    attributes = sensor.extra_state_attributes
+    assert "error" not in attributes
+    size = len(json.dumps(attributes, ensure_ascii=False, separators=(",", ":")).encode("utf-8"))
+    assert size <= DEFAULT_ATTRIBUTE_BUDGET
+    return attributes
+
+
+def test_large_outage_publishes_pages() -> None:
+    """By default the first pages of both reports are published."""
+    attributes = _render({})
+    assert attributes["devices_pages"] >= 1
+    assert attributes["entities_pages"] >= 1
+    for prefix in ("devices", "entities"):
+        for n in range(1, attributes[f"{prefix}_pages"] + 1):
+            assert f"{prefix}_page_{n}" in attributes
+        assert f"{prefix}_page_{attributes[f'{prefix}_pages'] + 1}" not in attributes
+
+
+def test_page_counts_without_room_for_pages() -> None:
+    """With the IDs filled first the page counts are still published."""
+    attributes = _render({CONF_ATTRIBUTE_PRIORITY: ["ids"]})
+    assert attributes["devices_pages"] == 0
+    assert attributes["entities_pages"] == 0
+    assert "devices_page_1" not in attributes
+    assert attributes["dropped"]["devices_pages"] >= 1
+
+
+def test_failed_refresh_is_written() -> None:
+    """A refresh failing or recovering is written even with an unchanged report."""
+    coordinator = SimpleNamespace(
+        entry=None,
+        options={},
+        stats=SimpleNamespace(last=None),
+        data=_large_outage(),
+        last_update_success=True,
+    )
+    sensor = UnavailableDevicesSensor(coordinator)
+    written: list[bool] = []
+    sensor.async_write_ha_state = lambda: written.append(sensor.available)
+
+    sensor._handle_coordinator_update()
+    sensor._handle_coordinator_update()
+    assert written == [True]
+
+    coordinator.last_update_success = False
+    sensor._handle_coordinator_update()
+    coordinator.last_update_success = True
+    sensor._handle_coordinator_update()
+    assert written == [True, False, True]
+
+
+def test_scan_duration_writes_once_per_interval(monkeypatch) -> None:
+    """Jittering cycle timings are written at most once per interval."""
+    cycle = SimpleNamespace(total_ms=20.0)
+    coordinator = SimpleNamespace(entry=None, stats=SimpleNamespace(last=cycle))
+    sensor = ScanDurationSensor(coordinator)
+    written: list[int | None] = []
+    sensor.async_write_ha_state = lambda: written.append(sensor.native_value)
+
+    clock = [1000.0]
+    monkeypatch.setattr(sensor_module.time, "monotonic", lambda: clock[0])
+    for step in range(60):
+        cycle.total_ms = 20.0 + step % 3
+        clock[0] += 60
+        sensor._handle_coordinator_update()
+    # One write at the start and one per ten minutes after it
+    assert len(written) == 6